@@ -1,69 +1,76 @@
-import numpy as np
+import argparse
+import os
+import sys
 import pandas as pd
 
-# Set the random seed for reproducibility
-np.random.seed(42)
-
-# Number of samples
-n_samples = 5000
-
-# Feature: Number of vehicles
-vehicle_count = np.random.randint(0, 50, n_samples)
-
-# Label: Duration of green light (in seconds)
-green_light_duration = np.random.normal(2, 0.5 ,n_samples) * vehicle_count + np.random.randint(1, 5, n_samples)
-
-# Create a DataFrame
-data = pd.DataFrame({
-    'vehicle_count': vehicle_count,
-    'green_light_duration': green_light_duration
-})
-
-# Save the dataset to a CSV file (optional)
-data.to_csv('traffic_data_conditioned_random.csv', index=False)
-
-# Load the modified dataset
-data = pd.read_csv('traffic_data_conditioned_random.csv')
-
-# Display the first few rows
-print(data.head(10))
-
-# The rest of the process remains the same as before
-# Split the data, train the model, and evaluate it as usual
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
-
-# Split the data into features (X) and label (y)
-X = data[['vehicle_count']]
-y = data['green_light_duration']
-
-# Split the data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-
-# Initialize the model
-model = LinearRegression()
-
-# Train the model
-model.fit(X_train, y_train)
-
-# Make predictions on the test set
-y_pred = model.predict(X_test)
-
-# Evaluate the model
-mse = mean_squared_error(y_test, y_pred)
-r2 = r2_score(y_test, y_pred)
-
-print(f"Mean Squared Error: {mse}")
-print(f"R^2 Score: {r2}")
-
-# Visualize the predictions
-import matplotlib.pyplot as plt
-
-plt.scatter(X_test, y_test, color='blue', label='Actual')
-plt.scatter(X_test, y_pred, color='red', label='Predicted')
-plt.xlabel('Number of Vehicles')
-plt.ylabel('Green Light Duration (seconds)')
-plt.legend()
-plt.title('Actual vs. Predicted Green Light Duration')
-plt.show()
\ No newline at end of file
+# synthetic_data.py lives in the project root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from synthetic_data import load_dataset, generate_chunked, CHUNK_ROWS
+
+
+def train_and_evaluate():
+    # 5000 samples from seed 42: feature is the number of vehicles, label the
+    # duration of green light (in seconds). Generated on the first run, then
+    # memory-mapped from the binary cache.
+    data = pd.DataFrame(load_dataset())
+
+    # Display the first few rows
+    print(data.head(10))
+
+    # The rest of the process remains the same as before
+    # Split the data, train the model, and evaluate it as usual
+    from sklearn.model_selection import train_test_split
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    # Split the data into features (X) and label (y)
+    X = data[['vehicle_count']]
+    y = data['green_light_duration']
+
+    # Split the data into training and testing sets
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+
+    # Initialize the model
+    model = LinearRegression()
+
+    # Train the model
+    model.fit(X_train, y_train)
+
+    # Make predictions on the test set
+    y_pred = model.predict(X_test)
+
+    # Evaluate the model
+    mse = mean_squared_error(y_test, y_pred)
+    r2 = r2_score(y_test, y_pred)
+
+    print(f"Mean Squared Error: {mse}")
+    print(f"R^2 Score: {r2}")
+
+    # Visualize the predictions
+    import matplotlib.pyplot as plt
+
+    plt.scatter(X_test, y_test, color='blue', label='Actual')
+    plt.scatter(X_test, y_pred, color='red', label='Predicted')
+    plt.xlabel('Number of Vehicles')
+    plt.ylabel('Green Light Duration (seconds)')
+    plt.legend()
+    plt.title('Actual vs. Predicted Green Light Duration')
+    plt.show()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the green light model, or generate a large synthetic dataset')
+    parser.add_argument('--generate', metavar='DIR',
+                        help='write a multi-feature dataset in columnar .npy chunks to DIR instead of training')
+    parser.add_argument('--rows', type=int, default=10000000)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.generate:
+        manifest = generate_chunked(args.generate, args.rows, seed=args.seed,
+                                    chunk_rows=args.chunk_rows, workers=args.workers)
+        print(f"Wrote {manifest['rows']} rows in {len(manifest['chunks'])} chunks to {args.generate}")
+    else:
+        train_and_evaluate()
@@ -0,0 +1,166 @@
+import argparse
+import importlib
+import itertools
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# synthetic_data.py lives in the project root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from synthetic_data import load_dataset, iter_chunks, read_manifest, FEATURE_COLUMNS, TARGET_COLUMN
+
+# Candidate regressors: name -> (estimator class, hyperparameter grid)
+CANDIDATES = {
+    'linear': ('sklearn.linear_model.LinearRegression', {}),
+    'ridge': ('sklearn.linear_model.Ridge', {'alpha': [0.1, 10.0]}),
+    'tree': ('sklearn.tree.DecisionTreeRegressor', {'max_depth': [4, 8]}),
+    'hist_gbm': ('sklearn.ensemble.HistGradientBoostingRegressor', {'max_iter': [50], 'max_depth': [4]}),
+    'forest': ('sklearn.ensemble.RandomForestRegressor', {'n_estimators': [20], 'max_depth': [8], 'max_samples': [0.2]}),
+}
+LATENCY_CALLS = 200  # Single-sample predictions timed per fitted model
+
+
+def load_arrays(data_dir, max_rows, seed):
+    # Feature matrix and target, from a chunked dataset or the small cached one
+    if data_dir is None:
+        data = load_dataset()
+        return np.asarray(data['vehicle_count'], dtype=np.float32).reshape(-1, 1), \
+            np.asarray(data['green_light_duration'], dtype=np.float32), ['vehicle_count']
+    total = read_manifest(data_dir)['rows']
+    keep = min(1.0, max_rows / total)  # Uniform subsample so every chunk contributes
+    rng = np.random.default_rng(seed)
+    X_parts, y_parts = [], []
+    for chunk in iter_chunks(data_dir):
+        mask = rng.random(len(chunk[TARGET_COLUMN])) < keep
+        X_parts.append(np.column_stack([chunk[c][mask] for c in FEATURE_COLUMNS]))
+        y_parts.append(np.asarray(chunk[TARGET_COLUMN][mask]))
+    return np.concatenate(X_parts), np.concatenate(y_parts), list(FEATURE_COLUMNS)
+
+
+def expand_grid(grid):
+    keys = sorted(grid)
+    for values in itertools.product(*(grid[k] for k in keys)):
+        yield dict(zip(keys, values))
+
+
+def split_fold(X, y, n_folds, fold, seed):
+    from sklearn.model_selection import KFold
+    train_idx, test_idx = list(KFold(n_folds, shuffle=True, random_state=seed).split(X))[fold]
+    return X[train_idx], y[train_idx], X[test_idx], y[test_idx]
+
+
+def build_model(class_path, params):
+    module_name, class_name = class_path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)(**params)
+
+
+def run_fold(job):
+    # Runs in a worker: fit one configuration on one fold and score it.
+    # Workers share the CPU, so nothing here is timed.
+    X_path, y_path, name, class_path, params, n_folds, fold, seed = job
+    from sklearn.metrics import mean_squared_error, r2_score
+    X = np.load(X_path, mmap_mode='r')
+    y = np.load(y_path, mmap_mode='r')
+    X_train, y_train, X_test, y_test = split_fold(X, y, n_folds, fold, seed)
+    model = build_model(class_path, params)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    return {
+        'model': name,
+        'params': format_params(params),
+        'fold': fold,
+        'mse': mean_squared_error(y_test, y_pred),
+        'r2': r2_score(y_test, y_pred),
+    }
+
+
+def time_model(X, y, name, class_path, params, n_folds, seed):
+    # Fit time and prediction latency on the first fold, measured in this
+    # process alone after the pool has finished
+    X_train, y_train, X_test, _ = split_fold(X, y, n_folds, 0, seed)
+    model = build_model(class_path, params)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.predict(X_test)
+    batch_time = time.perf_counter() - start
+
+    # Per-decision latency: the controller predicts one observation at a time
+    sample = X_test[:1]
+    times = np.empty(LATENCY_CALLS)
+    for i in range(LATENCY_CALLS):
+        start = time.perf_counter()
+        model.predict(sample)
+        times[i] = time.perf_counter() - start
+
+    return {
+        'model': name,
+        'params': format_params(params),
+        'fit_s': fit_time,
+        'batch_us_per_sample': batch_time / len(X_test) * 1e6,
+        'latency_us': np.median(times) * 1e6,
+    }
+
+
+def format_params(params):
+    return ', '.join(f'{k}={v}' for k, v in params.items())
+
+
+def evaluate(X, y, candidates, n_folds=5, workers=None, seed=42):
+    # Every (model, hyperparameters, fold) is an independent scoring job in
+    # the pool; workers memory-map the data from a temporary directory. Fit
+    # time and latency are then measured serially with BLAS and OpenMP held
+    # to one thread, so neither other jobs nor thread pools skew them.
+    from threadpoolctl import threadpool_limits, threadpool_info
+    configs = [(name, class_path, params) for name, (class_path, grid) in candidates.items()
+               for params in expand_grid(grid)]
+    with tempfile.TemporaryDirectory() as tmp:
+        X_path, y_path = os.path.join(tmp, 'X.npy'), os.path.join(tmp, 'y.npy')
+        np.save(X_path, X)
+        np.save(y_path, y)
+        jobs = [(X_path, y_path, name, class_path, params, n_folds, fold, seed)
+                for name, class_path, params in configs
+                for fold in range(n_folds)]
+        with ProcessPoolExecutor(workers) as pool:
+            rows = list(pool.map(run_fold, jobs))
+    with threadpool_limits(limits=1):
+        timings = pd.DataFrame([time_model(X, y, name, class_path, params, n_folds, seed)
+                                for name, class_path, params in configs])
+        # Thread pools loaded by the candidates, reported with the results
+        pinned = sorted({f"{pool['internal_api']}={pool['num_threads']}" for pool in threadpool_info()})
+    folds = pd.DataFrame(rows)
+    summary = folds.groupby(['model', 'params'], sort=False).agg(
+        mse=('mse', 'mean'), mse_std=('mse', 'std'), r2=('r2', 'mean'),
+    ).reset_index().merge(timings, on=['model', 'params'])
+    return summary.sort_values('mse').reset_index(drop=True), pinned
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cross-validate candidate controller models on accuracy and latency')
+    parser.add_argument('--data', metavar='DIR', help='chunked dataset written by AI-Model.py --generate '
+                                                       '(default: the cached 5000-sample dataset)')
+    parser.add_argument('--max-rows', type=int, default=1000000, help='subsample large datasets to this many rows')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--models', nargs='+', choices=sorted(CANDIDATES), default=sorted(CANDIDATES))
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', metavar='CSV', help='also write the results table to CSV')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    X, y, features = load_arrays(args.data, args.max_rows, args.seed)
+    print(f"{len(y)} rows, features: {', '.join(features)}")
+    results, pinned = evaluate(X, y, {name: CANDIDATES[name] for name in args.models}, args.folds, args.workers, args.seed)
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        print(results.to_string(index=False, float_format=lambda v: f'{v:.4g}'))
+    print(f"fit_s and latency timed serially on fold 0 after cross-validation, "
+          f"thread pools pinned: {', '.join(pinned) or 'none loaded'}")
+    print(f"Done in {time.perf_counter() - start:.1f} s")
+    if args.out:
+        results.to_csv(args.out, index=False)
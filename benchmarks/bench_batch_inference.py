@@ -0,0 +1,62 @@
+import argparse
+import os
+import random
+import sys
+import time
+import numpy as np
+
+# Per-tick cost of the green light model for many headless games: one
+# predict call per game versus one BatchInference call for all of them.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from simulation import CarGame
+from batch_inference import BatchInference
+
+
+def make_games(n_games, seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    return [CarGame(headless=True, realtime=False) for _ in range(n_games)]
+
+
+def time_ticks(games, ticks, predict):
+    # Steps the games, timing only the model evaluation of each tick
+    model_time = 0.0
+    for _ in range(ticks):
+        start = time.perf_counter()
+        predict()
+        model_time += time.perf_counter() - start
+        for game in games:
+            game.play_step()
+    return model_time / ticks
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark batched green light model inference')
+    parser.add_argument('--games', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--ticks', type=int, default=400)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'games':>6}{'per-game us':>13}{'batched us':>12}{'speedup':>9}")
+    for n_games in args.games:
+        games = make_games(n_games, args.seed)
+
+        def per_game():
+            for game in games:
+                game._prediction_key = None  # What every game pays when its counts change
+                game.predict_green_light_duration()
+
+        single = time_ticks(games, args.ticks, per_game)
+
+        games = make_games(n_games, args.seed)
+        batch = BatchInference(games)
+
+        def batched():
+            for game in games:
+                game._prediction_key = None
+            batch.prefetch()
+
+        batched_time = time_ticks(games, args.ticks, batched)
+        print(f"{n_games:>6}{single * 1e6:>13.1f}{batched_time * 1e6:>12.1f}{single / batched_time:>9.1f}")
@@ -0,0 +1,67 @@
+import argparse
+import os
+import random
+import sys
+import time
+import numpy as np
+
+# Decision cost and traffic outcome of each signal controller on the same
+# seeded headless episodes, on the simulated clock.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from simulation import CarGame, SPEED
+from controllers import CONTROLLERS
+
+
+class TimedController:
+    # Wraps a controller and records how long each decision takes
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.times = []
+
+    def decide(self, game):
+        start = time.perf_counter()
+        decision = self.controller.decide(game)
+        self.times.append(time.perf_counter() - start)
+        return decision
+
+
+def run_episode(name, seed, steps):
+    random.seed(seed)
+    np.random.seed(seed)
+    controller = TimedController(CONTROLLERS[name]()) if name != 'model' else None
+    game = CarGame(headless=True, realtime=False, controller=controller)
+    stopped = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        game.play_step()
+        stopped += game.calculate_waiting_time()
+    elapsed = time.perf_counter() - start
+    decisions = controller.times if controller is not None else []
+    return {
+        'passed': game.total_cars_passed,
+        'stopped': stopped / steps,
+        'switches': game.phase_switches,
+        'decisions': len(decisions),
+        'decide_us': np.median(decisions) * 1e6 if decisions else float('nan'),
+        'step_us': elapsed / steps * 1e6,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark signal controllers on seeded headless episodes')
+    parser.add_argument('--controllers', nargs='+', choices=['model'] + sorted(CONTROLLERS),
+                        default=['model'] + sorted(CONTROLLERS))
+    parser.add_argument('--episodes', type=int, default=3)
+    parser.add_argument('--steps', type=int, default=6000, help=f'simulation steps per episode ({SPEED} per simulated second)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'controller':<14}{'passed':>8}{'stopped':>9}{'switches':>10}{'decide us':>11}{'step us':>9}")
+    for name in args.controllers:
+        runs = [run_episode(name, args.seed + episode, args.steps) for episode in range(args.episodes)]
+        mean = {key: np.mean([run[key] for run in runs]) for key in runs[0]}
+        print(f"{name:<14}{mean['passed']:>8.1f}{mean['stopped']:>9.2f}{mean['switches']:>10.1f}"
+              f"{mean['decide_us']:>11.1f}{mean['step_us']:>9.1f}")
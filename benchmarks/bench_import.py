@@ -0,0 +1,45 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Cold import time of simulation.py in fresh interpreters, and a check that
+# importing it leaves pygame, matplotlib and sklearn unloaded.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pygame.base', 'pygame.font', 'matplotlib', 'sklearn', 'joblib')
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import simulation
+elapsed = time.perf_counter() - start
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed * 1000, ','.join(loaded))
+"""
+
+
+def run_once():
+    probe = PROBE.format(heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout.split()
+    return float(out[0]), out[1].split(',') if len(out) > 1 else []
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the import time of simulation.py')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-ms', type=float, default=None, help='fail if the median import takes longer')
+    args = parser.parse_args()
+
+    times = []
+    for _ in range(args.runs):
+        elapsed, loaded = run_once()
+        if loaded:
+            sys.exit(f"Importing simulation loaded {', '.join(loaded)}")
+        times.append(elapsed)
+    median = statistics.median(times)
+    print(f"import simulation: median {median:.1f} ms, min {min(times):.1f} ms over {args.runs} runs")
+    if args.max_ms is not None and median > args.max_ms:
+        sys.exit(f"Median import time {median:.1f} ms exceeds {args.max_ms} ms")
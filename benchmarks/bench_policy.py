@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# Per-decision latency of exported NumPy policies against the objects they
+# were exported from, checking that both give the same decisions. Fails if
+# an exported policy misses its latency target.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from policy_export import export_policy, compile_policy, forward_batch
+from q_learning import QLearningController, DURATIONS
+
+TARGETS_US = {'linear': 5.0, 'mlp': 30.0, 'q_table': 15.0}  # Median per-decision latency
+
+
+def median_us(fn, args, calls):
+    times = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        fn(*args)
+        times[i] = time.perf_counter() - start
+    return np.median(times) * 1e6
+
+
+def training_data(rng, n_rows=2000):
+    X = rng.integers(0, 21, (n_rows, 1)).astype(np.float64)
+    return X, 2 * X[:, 0] + 5 + rng.normal(0, 1, n_rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark exported NumPy policies against their sources')
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply the latency targets, e.g. on slow machines')
+    args = parser.parse_args()
+
+    from sklearn.linear_model import LinearRegression
+    from sklearn.neural_network import MLPRegressor
+    rng = np.random.default_rng(0)
+    X, y = training_data(rng)
+    q_controller = QLearningController(seed=0)
+    q_controller.q[:] = rng.normal(size=q_controller.q.shape)
+    q_controller.learning = False  # Greedy, like the exported policy
+    sources = {
+        'linear': LinearRegression().fit(X, y),
+        'mlp': MLPRegressor(hidden_layer_sizes=(16, 16), max_iter=300, random_state=0).fit(X, y),
+        'q_table': q_controller,
+    }
+
+    failures = []
+    print(f"{'policy':<9}{'source us':>11}{'exported us':>13}{'target us':>11}")
+    for kind, trained in sources.items():
+        policy = export_policy(trained)
+        forward = compile_policy(policy)
+        if kind == 'q_table':
+            counts, elapsed, phase = np.array([2, 0, 7, 12]), 6.0, 1
+            action = trained.act(int(trained.encode(counts, elapsed, phase)))
+            assert forward(counts, elapsed, phase) == (action // len(DURATIONS), float(DURATIONS[action % len(DURATIONS)]))
+            source_us = median_us(lambda: trained.act(int(trained.encode(counts, elapsed, phase))), (), args.calls)
+            exported_us = median_us(forward, (counts, elapsed, phase), args.calls)
+        else:
+            assert np.allclose(forward_batch(policy, X), trained.predict(X))
+            x = X[0]
+            assert np.isclose(forward(x), trained.predict(x[None, :])[0])
+            source_us = median_us(trained.predict, (x[None, :],), args.calls // 10)
+            exported_us = median_us(forward, (x,), args.calls)
+        target = TARGETS_US[kind] * args.scale
+        print(f"{kind:<9}{source_us:>11.1f}{exported_us:>13.1f}{target:>11.1f}")
+        if exported_us > target:
+            failures.append(f"{kind} policy takes {exported_us:.1f} us per decision, target {target:.1f} us")
+    if failures:
+        sys.exit('\n'.join(failures))
@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Two model registries on one directory, as with a --watch-model simulation
+# and an offline retrain registering side by side. Fails if they hand out
+# the same version, lose each other's index entries or overwrite weights.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from model_format import LinearModel
+from model_registry import ModelRegistry, file_hash
+
+
+def register_many(root, worker, count):
+    # Registers `count` models, each recognisable by its intercept
+    registry = ModelRegistry(root)
+    return [(registry.register(LinearModel([1.0], worker * 1000 + i), {'reward': float(i)}), worker * 1000 + i)
+            for i in range(count)]
+
+
+def check(root, registered):
+    registry = ModelRegistry(root)
+    problems = []
+    versions = [version for version, _ in registered]
+    if len(set(versions)) != len(versions):
+        problems.append(f"{len(versions) - len(set(versions))} versions were handed out twice")
+    if len(registry.index['versions']) != len(versions):
+        problems.append(f"index holds {len(registry.index['versions'])} of {len(versions)} versions")
+    overwritten = [version for version, intercept in registered if str(version) in registry.index['versions']
+                   and (file_hash(registry.path(version)) != registry.entry(version)['sha256']
+                        or registry.load(version).intercept_ != intercept)]
+    if overwritten:
+        problems.append(f"{len(overwritten)} versions do not hold the model registered as them")
+    return problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check that concurrent model registries do not clash')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--models', type=int, default=25, help='models registered per process')
+    args = parser.parse_args()
+
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Two registries opened before either registers, in one process
+        first, second = ModelRegistry(tmp), ModelRegistry(tmp)
+        registered = [(first.register(LinearModel([1.0], 1.0)), 1.0), (second.register(LinearModel([1.0], 2.0)), 2.0)]
+        problems += [f"side by side: {problem}" for problem in check(tmp, registered)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with ProcessPoolExecutor(args.processes) as pool:
+            results = pool.map(register_many, [tmp] * args.processes, range(args.processes),
+                               [args.models] * args.processes)
+            registered = [item for result in results for item in result]
+        problems += [f"{args.processes} processes: {problem}" for problem in check(tmp, registered)]
+
+    if problems:
+        sys.exit('\n'.join(problems))
+    print(f"Two registries and {args.processes} processes x {args.models} models registered without clashes")
@@ -0,0 +1,135 @@
+from collections import defaultdict
+from lazy_import import lazy_import
+
+pygame = lazy_import('pygame')  # Imported by simulation.py, keep that import cheap
+
+MIN_ZOOM = 0.1
+MAX_ZOOM = 4.0
+ZOOM_STEP = 1.1
+PAN_STEP = 40  # Screen pixels per arrow key press
+AGGREGATE_ZOOM = 0.5  # Below this zoom cars are replaced by per-link colouring
+GRID_CELL = 200  # World pixels per spatial index cell
+
+
+class SpatialGrid:
+    # Uniform grid over world space. Each item is registered in every cell its
+    # rect overlaps, so a viewport query only looks at the cells on screen.
+
+    def __init__(self, cell=GRID_CELL):
+        self.cell = cell
+        self.cells = defaultdict(list)
+        self.items = []
+
+    def _cell_range(self, rect):
+        c = self.cell
+        return (range(rect.left // c, (rect.right - 1) // c + 1),
+                range(rect.top // c, (rect.bottom - 1) // c + 1))
+
+    def insert(self, rect, item):
+        index = len(self.items)
+        self.items.append((rect, item))
+        cols, rows = self._cell_range(rect)
+        for col in cols:
+            for row in rows:
+                self.cells[(col, row)].append(index)
+        return index
+
+    def query(self, rect):
+        # Indices of items overlapping rect, in insertion (draw) order
+        found = set()
+        cols, rows = self._cell_range(rect)
+        for col in cols:
+            for row in rows:
+                found.update(self.cells.get((col, row), ()))
+        return sorted(i for i in found if self.items[i][0].colliderect(rect))
+
+
+class Camera:
+    # Maps world coordinates to the window: screen = (world - offset) * zoom
+
+    def __init__(self, view_size):
+        self.view_w, self.view_h = view_size
+        self.reset()
+        self.dragging = False
+
+    def reset(self):
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.zoom = 1.0
+
+    @property
+    def is_identity(self):
+        return self.zoom == 1.0 and self.offset_x == 0.0 and self.offset_y == 0.0
+
+    @property
+    def aggregated(self):
+        return self.zoom < AGGREGATE_ZOOM
+
+    def world_rect(self):
+        return pygame.Rect(int(self.offset_x), int(self.offset_y),
+                           int(self.view_w / self.zoom) + 1, int(self.view_h / self.zoom) + 1)
+
+    def to_world(self, pos):
+        return (pos[0] / self.zoom + self.offset_x, pos[1] / self.zoom + self.offset_y)
+
+    def to_screen(self, xs, ys):
+        return (xs - self.offset_x) * self.zoom, (ys - self.offset_y) * self.zoom
+
+    def to_screen_rect(self, rect):
+        x, y = self.to_screen(rect.x, rect.y)
+        return pygame.Rect(round(x), round(y), max(1, round(rect.w * self.zoom)), max(1, round(rect.h * self.zoom)))
+
+    def visible(self, xs, ys, size):
+        # Mask of size x size squares at (xs, ys) that overlap the viewport
+        view = self.world_rect()
+        return (xs + size > view.left) & (xs < view.right) & (ys + size > view.top) & (ys < view.bottom)
+
+    def pan(self, dx, dy):
+        self.offset_x += dx / self.zoom
+        self.offset_y += dy / self.zoom
+
+    def zoom_at(self, factor, screen_pos):
+        # Keep the world point under the cursor fixed while zooming
+        wx, wy = self.to_world(screen_pos)
+        self.zoom = min(MAX_ZOOM, max(MIN_ZOOM, self.zoom * factor))
+        self.offset_x = wx - screen_pos[0] / self.zoom
+        self.offset_y = wy - screen_pos[1] / self.zoom
+
+    def blit_world(self, target, surface):
+        # Draw a world-sized surface (e.g. the heatmap) through the camera
+        if self.is_identity:
+            target.blit(surface, (0, 0))
+            return
+        view = self.world_rect().clip(surface.get_rect())
+        if not view.w or not view.h:
+            return
+        scaled = pygame.transform.scale(surface.subsurface(view), self.to_screen_rect(view).size)
+        scaled.set_colorkey(surface.get_colorkey())
+        scaled.set_alpha(surface.get_alpha())
+        target.blit(scaled, self.to_screen_rect(view))
+
+    def handle_event(self, event):
+        # Returns True when the event was used for panning or zooming
+        if event.type == pygame.MOUSEWHEEL:
+            self.zoom_at(ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3):
+            self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self.pan(-event.rel[0], -event.rel[1])
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
+            dx = {pygame.K_LEFT: -PAN_STEP, pygame.K_RIGHT: PAN_STEP}.get(event.key, 0)
+            dy = {pygame.K_UP: -PAN_STEP, pygame.K_DOWN: PAN_STEP}.get(event.key, 0)
+            self.pan(dx, dy)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_0:
+            self.reset()
+        else:
+            return False
+        return True
+
+
+def queue_color(count, full=10):
+    # Road colour fading from green (empty) to red (`full` or more queued cars)
+    t = min(max(count, 0) / full, 1.0)
+    return (int(60 + 160 * t), int(160 * (1 - t) + 30), 40)
@@ -0,0 +1,177 @@
+import random
+import sys
+from collections import deque
+import numpy as np
+from model_registry import atomic_write
+
+# A learning session in one .npz: model and RLS state, the filled part of the
+# replay buffer, the simulation state down to every car, the metric history,
+# the signal controller's state_dict() and the Python and NumPy global RNG
+# states. Written atomically, so a crash while saving leaves the previous
+# checkpoint intact.
+
+FORMAT_VERSION = 1
+CHECKPOINT_EVERY = 1  # Generations between periodic checkpoints
+
+# Plain numbers copied to and from CarGame as they are
+SCALARS = ('generation', 'cars_passed', 'total_cars_passed', 'cycle_count', 'phase_switches', 'frame',
+           'current_signal_index', 'green_duration', 'simulation_started')
+# Timestamps on the game clock, shifted to the new clock on resume
+TIMES = ('spawn_time', 'last_switch_time')
+
+
+def game_state(game):
+    # Everything needed to continue `game` exactly where it is
+    if game.trainer is not None:
+        # Let pending updates land so the learner is idle and in step with the model
+        game.trainer.drain()
+        game._swap_trained_model()
+    state = {
+        'format_version': np.array(FORMAT_VERSION),
+        'clock': np.array(game.now()),
+        'sim_time': np.array(game.sim_time),
+        'model_coef': np.ravel(game.model.coef_).astype(np.float64),
+        'model_intercept': np.array(float(np.ravel(game.model.intercept_)[0])),
+        'rls_w': game.learner.w.copy(),
+        'rls_P': game.learner.P.copy(),
+        'rls_updates': np.array(game.learner.n_updates),
+        'counters': np.array(list(game.counters.values())),
+        'arrivals': game.arrivals.copy(),
+        'red_since': game.red_since.copy(),
+        'arrival_times': np.array([t for t, _ in game.features.arrival_history]),
+        'arrival_counts': np.array([counts for _, counts in game.features.arrival_history]),
+        'car_x': np.array([car[0].x for car in game.cars], dtype=np.float64),
+        'car_y': np.array([car[0].y for car in game.cars], dtype=np.float64),
+        'car_direction': np.array([car[1].value for car in game.cars], dtype=np.int8),
+        'car_speed': np.array([car[2] for car in game.cars], dtype=np.float64),
+        'car_stopped': np.array([car[3] for car in game.cars], dtype=bool),
+        'car_wait': np.array([car[4] for car in game.cars], dtype=np.float64),
+        'replay_pos': np.array(game.replay.pos),
+        'replay_size': np.array(game.replay.size),
+    }
+    for name in SCALARS + TIMES:
+        state[name] = np.array(getattr(game, name))
+    if game.last_observation is not None:
+        state['last_observation'] = game.last_observation
+        state['last_action'] = game.last_action
+    for name, array in game.replay.arrays.items():
+        state[f'replay_{name}'] = array[:game.replay.size]
+    if game.data:
+        for key in game.data[0]:
+            state[f'data_{key}'] = np.array([row[key] for row in game.data])
+    if game.controller is not None:
+        state['controller'] = np.array(type(game.controller).__name__)
+        for name, value in game.controller.state_dict().items():
+            state[f'controller_{name}'] = np.asarray(value)
+
+    version, keys, gauss = random.getstate()
+    state['py_rng_version'] = np.array(version)
+    state['py_rng_keys'] = np.array(keys, dtype=np.int64)
+    state['py_rng_gauss'] = np.array(np.nan if gauss is None else gauss)
+    _, keys, pos, has_gauss, cached = np.random.get_state()
+    state['np_rng_keys'] = keys
+    state['np_rng_pos'] = np.array(pos)
+    state['np_rng_gauss'] = np.array([has_gauss, cached])
+    return state
+
+
+def save_checkpoint(game, path):
+    state = game_state(game)
+    atomic_write(path, lambda f: np.savez(f, **state))
+
+
+def load_checkpoint(game, path):
+    # Restore a checkpoint into a freshly constructed CarGame. Cars are built
+    # from the game's own module: run as a script that is __main__, and
+    # importing simulation would give a second, non-matching Direction enum.
+    module = sys.modules[type(game).__module__]
+    Direction, Point = module.Direction, module.Point
+    with np.load(path) as data:
+        state = {name: data[name] for name in data.files}
+    if int(state['format_version']) > FORMAT_VERSION:
+        raise ValueError(f"{path} uses checkpoint format {int(state['format_version'])}, "
+                         f"this code reads up to {FORMAT_VERSION}")
+    if len(state['rls_w']) != len(game.learner.w):
+        raise ValueError(f"{path} holds a model with {len(state['rls_w']) - 1} features, "
+                         f"expected {len(game.learner.w) - 1}")
+    if int(state['replay_size']) > game.replay.capacity:
+        raise ValueError(f"{path} holds {int(state['replay_size'])} transitions, "
+                         f"more than the replay capacity {game.replay.capacity}")
+    saved_controller = str(state['controller']) if 'controller' in state else None
+    controller = type(game.controller).__name__ if game.controller is not None else None
+    if saved_controller != controller:
+        raise ValueError(f"{path} was saved with controller {saved_controller}, this run uses {controller}")
+
+    if not game.realtime:
+        game.sim_time = float(state['sim_time'])
+    offset = game.now() - float(state['clock'])  # Zero on the simulated clock
+
+    for name in SCALARS:
+        setattr(game, name, state[name].item())
+    for name in TIMES:
+        setattr(game, name, float(state[name]) + offset)
+    game.red_since[:] = state['red_since'] + offset
+    game.arrivals[:] = state['arrivals']
+    game.features.arrival_history = deque(
+        (float(t) + offset, counts) for t, counts in zip(state['arrival_times'], state['arrival_counts']))
+    for key, value in zip(game.counters, state['counters'].tolist()):
+        game.counters[key] = value
+    game.cars = [[Point(_as_int(x), _as_int(y)), Direction(direction), _as_int(speed), stopped, wait]
+                 for x, y, direction, speed, stopped, wait in zip(
+                     state['car_x'].tolist(), state['car_y'].tolist(), state['car_direction'].tolist(),
+                     state['car_speed'].tolist(), state['car_stopped'].tolist(), state['car_wait'].tolist())]
+
+    game.model.coef_ = state['model_coef']
+    game.model.intercept_ = float(state['model_intercept'])
+    game.learner.w[:] = state['rls_w']  # In place: a background trainer holds the same learner
+    game.learner.P = state['rls_P']
+    game.learner.n_updates = int(state['rls_updates'])
+    game._refresh_predictor()
+
+    size = int(state['replay_size'])
+    for name, array in game.replay.arrays.items():
+        array[:size] = state[f'replay_{name}']
+    game.replay.pos = int(state['replay_pos'])
+    game.replay.size = size
+    if 'last_observation' in state:
+        game.last_observation = state['last_observation']
+        game.last_action = state['last_action']
+    data_keys = [name[len('data_'):] for name in state if name.startswith('data_')]
+    if data_keys:
+        columns = [state[f'data_{key}'].tolist() for key in data_keys]
+        game.data = [dict(zip(data_keys, row)) for row in zip(*columns)]
+    if game.controller is not None:
+        game.controller.load_state_dict({name[len('controller_'):]: value for name, value in state.items()
+                                         if name.startswith('controller_')})
+
+    gauss = float(state['py_rng_gauss'])
+    random.setstate((int(state['py_rng_version']), tuple(state['py_rng_keys'].tolist()),
+                     None if np.isnan(gauss) else gauss))
+    has_gauss, cached = state['np_rng_gauss'].tolist()
+    np.random.set_state(('MT19937', state['np_rng_keys'], int(state['np_rng_pos']), int(has_gauss), cached))
+
+
+def _as_int(value):
+    # Car positions and speeds are ints unless something made them fractional
+    return int(value) if float(value).is_integer() else value
+
+
+class Checkpointer:
+    # Saves a checkpoint every `every` generations, called once per frame
+
+    def __init__(self, path, every=CHECKPOINT_EVERY):
+        self.path = path
+        self.every = every
+        self.saved_generation = None
+        self.saves = 0
+
+    def maybe_save(self, game):
+        if game.generation == 0 or game.generation % self.every or game.generation == self.saved_generation:
+            return False
+        self.save(game)
+        return True
+
+    def save(self, game):
+        save_checkpoint(game, self.path)
+        self.saved_generation = game.generation
+        self.saves += 1
@@ -0,0 +1,144 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from features import APPROACHES, FEATURES
+from simulation import SIGNAL_COUNTERS
+
+# Phases are indexes into SIGNAL_LAYOUT (west, east, north, south);
+# PHASE_ROWS maps each one to its row of the CarGame.observe() array.
+PHASE_ROWS = tuple(APPROACHES.index(key) for key in SIGNAL_COUNTERS)
+N_PHASES = len(SIGNAL_COUNTERS)
+QUEUE = FEATURES.index('queue_length')
+OCCUPANCY = FEATURES.index('occupancy')
+
+FIXED_GREEN = 30.0  # GREEN timer of the fixed-timer prototype (timers = [180, 5, 30])
+MIN_GREEN = 5.0
+MAX_GREEN = 30.0
+PASSAGE_TIME = 1.0  # Green added per actuation while a vehicle is on the approach
+DECISION_INTERVAL = 5.0  # Max-pressure re-evaluates this often
+
+
+class SignalController(ABC):
+    # Interface for CarGame(controller=...). decide(game) is called whenever
+    # the current green runs out and returns (phase, green seconds). Returning
+    # the phase that is green already extends it instead of switching.
+    # Controllers keep their working arrays preallocated, so a decision does
+    # not allocate beyond what game.observe() needs.
+
+    def reset(self):
+        # Forget per-episode state
+        pass
+
+    @abstractmethod
+    def decide(self, game):
+        pass
+
+    def state_dict(self):
+        # Whatever decide() depends on beyond the constructor arguments, as
+        # name -> number or NumPy array, so a checkpoint can continue exactly
+        return {}
+
+    def load_state_dict(self, state):
+        pass
+
+
+class FixedTimeController(SignalController):
+    # Pretimed plan: phases in a fixed order, each with a fixed green
+
+    def __init__(self, greens=FIXED_GREEN, order=None):
+        self.order = tuple(range(N_PHASES)) if order is None else tuple(order)
+        self.set_greens(greens)
+        self.reset()
+
+    def set_greens(self, greens):
+        # One green for every phase, or one per phase in SIGNAL_LAYOUT order
+        self.greens = [float(g) for g in np.broadcast_to(greens, (N_PHASES,))]
+
+    def reset(self):
+        self.position = -1
+
+    def decide(self, game):
+        self.position = (self.position + 1) % len(self.order)
+        phase = self.order[self.position]
+        return phase, self.greens[phase]
+
+    def state_dict(self):
+        return {'position': self.position, 'greens': np.array(self.greens)}
+
+    def load_state_dict(self, state):
+        self.position = int(state['position'])
+        self.set_greens(state['greens'])
+
+
+class ActuatedController(SignalController):
+    # Fully actuated control: a phase starts with min_green and is extended by
+    # `passage` seconds while a vehicle is on its approach. It ends when the
+    # approach empties (gap-out) or after max_green (max-out); the next phase
+    # is the first one in cyclic order with vehicles waiting.
+
+    def __init__(self, min_green=MIN_GREEN, max_green=MAX_GREEN, passage=PASSAGE_TIME):
+        self.min_green = min_green
+        self.max_green = max_green
+        self.passage = passage
+        self.reset()
+
+    def reset(self):
+        self.gap_outs = 0
+        self.max_outs = 0
+
+    def decide(self, game):
+        occupancy = game.observe()[:, OCCUPANCY]
+        phase = game.current_signal_index
+        green_for = game.now() - game.last_switch_time
+        if occupancy[PHASE_ROWS[phase]] > 0:
+            if green_for + self.passage <= self.max_green:
+                return phase, self.passage
+            self.max_outs += 1
+        else:
+            self.gap_outs += 1
+
+        following = (phase + 1) % N_PHASES
+        for step in range(1, N_PHASES):
+            candidate = (phase + step) % N_PHASES
+            if occupancy[PHASE_ROWS[candidate]] > 0:
+                following = candidate
+                break
+        return following, self.min_green
+
+    def state_dict(self):
+        return {'gap_outs': self.gap_outs, 'max_outs': self.max_outs}
+
+    def load_state_dict(self, state):
+        self.gap_outs = int(state['gap_outs'])
+        self.max_outs = int(state['max_outs'])
+
+
+class MaxPressureController(SignalController):
+    # Every `interval` seconds, serve the phase with the highest pressure
+    # (upstream minus downstream queue). Exits never back up in this network,
+    # so the downstream term is zero and pressure is the approach queue.
+
+    def __init__(self, interval=DECISION_INTERVAL):
+        self.interval = interval
+        self.pressure = np.zeros(N_PHASES, dtype=np.float32)
+        self.rows = np.array(PHASE_ROWS)
+
+    def decide(self, game):
+        np.take(game.observe()[:, QUEUE], self.rows, out=self.pressure)
+        phase = int(self.pressure.argmax())
+        if self.pressure[phase] <= self.pressure[game.current_signal_index]:
+            phase = game.current_signal_index  # Ties keep the current green
+        return phase, self.interval
+
+
+def _webster_controller():
+    # webster.py builds on this module, so it is imported on demand
+    from webster import WebsterController
+    return WebsterController()
+
+
+CONTROLLERS = {
+    'fixed': FixedTimeController,
+    'actuated': ActuatedController,
+    'max-pressure': MaxPressureController,
+    'webster': _webster_controller,
+}
@@ -0,0 +1,165 @@
+import argparse
+import json
+import multiprocessing
+import random
+import numpy as np
+from simulation import SIGNAL_COUNTERS
+from controllers import SignalController
+
+# Genome: min green, max green, slope and intercept of the green duration
+# model, then one random key per phase; the phases run in the order of their
+# sorted keys, so any real vector decodes to a valid cycle order.
+LOWER = np.array([2.0, 5.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+UPPER = np.array([10.0, 40.0, 4.0, 15.0, 1.0, 1.0, 1.0, 1.0])
+
+POPULATION = 24
+ELITE_SIZE = 8
+MUTATION_SCALE = 0.1  # Std of Gaussian mutation, relative to the parameter range
+WAIT_WEIGHT = 0.5  # Fitness lost per car stopped on average
+EPISODE_STEPS = 6000  # 5 simulated minutes
+
+
+class TimingPolicy(SignalController):
+    # Cyclic plan: phases in a fixed order, each green for
+    # clip(slope * queue + intercept, min_green, max_green) seconds.
+
+    def __init__(self, genome):
+        genome = np.clip(np.asarray(genome, dtype=np.float64), LOWER, UPPER)
+        self.min_green, self.max_green, self.slope, self.intercept = genome[:4]
+        self.max_green = max(self.max_green, self.min_green)
+        self.order = [int(i) for i in np.argsort(genome[4:])]
+        self.position = -1
+
+    def decide(self, game):
+        self.position = (self.position + 1) % len(self.order)
+        phase = self.order[self.position]
+        queue = game.counters[SIGNAL_COUNTERS[phase]]
+        duration = min(max(self.slope * queue + self.intercept, self.min_green), self.max_green)
+        return phase, duration
+
+    def state_dict(self):
+        return {'position': self.position}
+
+    def load_state_dict(self, state):
+        self.position = int(state['position'])
+
+    def describe(self):
+        return {
+            'min_green': float(self.min_green),
+            'max_green': float(self.max_green),
+            'slope': float(self.slope),
+            'intercept': float(self.intercept),
+            'order': [SIGNAL_COUNTERS[i] for i in self.order],
+        }
+
+
+def evaluate(args):
+    # One headless episode; runs in a worker process
+    genome, seed, steps = args
+    from simulation import CarGame
+    random.seed(seed)
+    np.random.seed(seed)
+    game = CarGame(headless=True, realtime=False, controller=TimingPolicy(genome))
+    waiting = 0
+    for _ in range(steps):
+        game.play_step()
+        waiting += game.calculate_waiting_time()
+    return game.total_cars_passed - WAIT_WEIGHT * waiting / steps
+
+
+class EvolutionaryOptimizer:
+    # Simple real-coded GA: tournament selection, blend crossover, Gaussian
+    # mutation and elitism. Each generation is evaluated in parallel on the
+    # same traffic seeds, and the best genomes seen so far are kept in `archive`.
+
+    def __init__(self, population=POPULATION, elite_size=ELITE_SIZE, episodes=1,
+                 steps=EPISODE_STEPS, workers=None, seed=None):
+        self.population_size = population
+        self.elite_size = elite_size
+        self.episodes = episodes
+        self.steps = steps
+        self.rng = np.random.RandomState(seed)
+        self.pool = multiprocessing.Pool(workers)
+        self.population = LOWER + self.rng.rand(population, len(LOWER)) * (UPPER - LOWER)
+        self.archive = []  # (mean fitness, genome, evaluations) sorted best first
+        self.n_carried = 0  # Leading individuals that are archive elites already
+        self.generation = 0
+
+    def evaluate_population(self):
+        seeds = self.rng.randint(0, 2 ** 31 - 1, self.episodes)
+        jobs = [(genome, int(seed), self.steps) for genome in self.population for seed in seeds]
+        scores = np.array(self.pool.map(evaluate, jobs)).reshape(len(self.population), self.episodes)
+        return scores.mean(axis=1)
+
+    def _tournament(self, fitness, k=3):
+        contenders = self.rng.randint(0, len(fitness), k)
+        return self.population[contenders[np.argmax(fitness[contenders])]]
+
+    def step(self):
+        fitness = self.evaluate_population()
+        # Elites lead the population in archive order. Their new episodes go
+        # into a running mean, so one lucky evaluation cannot keep a genome
+        # on top, and selection sees the same averaged score.
+        for i in range(self.n_carried):
+            mean, genome, evaluations = self.archive[i]
+            evaluations += 1
+            mean += (fitness[i] - mean) / evaluations
+            self.archive[i] = (mean, genome, evaluations)
+            fitness[i] = mean
+        self.archive.extend((score, genome, 1) for score, genome in
+                            zip(fitness.tolist()[self.n_carried:], self.population[self.n_carried:].copy()))
+        self.archive.sort(key=lambda item: item[0], reverse=True)
+        del self.archive[self.elite_size:]
+
+        children = [genome for _, genome, _ in self.archive]
+        self.n_carried = len(children)
+        span = UPPER - LOWER
+        while len(children) < self.population_size:
+            a, b = self._tournament(fitness), self._tournament(fitness)
+            mix = self.rng.rand(len(LOWER))
+            child = mix * a + (1 - mix) * b
+            child += self.rng.randn(len(LOWER)) * MUTATION_SCALE * span
+            children.append(np.clip(child, LOWER, UPPER))
+        self.population = np.array(children)
+        self.generation += 1
+        return fitness
+
+    def best(self):
+        fitness, genome, _ = self.archive[0]
+        return fitness, TimingPolicy(genome)
+
+    def save_archive(self, path):
+        entries = [{'fitness': fitness, 'evaluations': evaluations, 'genome': genome.tolist(),
+                    'policy': TimingPolicy(genome).describe()}
+                   for fitness, genome, evaluations in self.archive]
+        with open(path, 'w') as f:
+            json.dump(entries, f, indent=2)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Evolve signal timing policies on parallel headless episodes')
+    parser.add_argument('--generations', type=int, default=20)
+    parser.add_argument('--population', type=int, default=POPULATION)
+    parser.add_argument('--episodes', type=int, default=1, help='episodes per individual')
+    parser.add_argument('--steps', type=int, default=EPISODE_STEPS)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default='elite_archive.json')
+    args = parser.parse_args()
+
+    optimizer = EvolutionaryOptimizer(args.population, episodes=args.episodes, steps=args.steps,
+                                      workers=args.workers, seed=args.seed)
+    try:
+        for _ in range(args.generations):
+            fitness = optimizer.step()
+            print(f"Generation {optimizer.generation}: best {fitness.max():.1f}, mean {fitness.mean():.1f}, "
+                  f"archive best {optimizer.archive[0][0]:.1f}")
+    finally:
+        optimizer.close()
+    optimizer.save_archive(args.out)
+    fitness, policy = optimizer.best()
+    print(f"Best policy ({fitness:.1f}): {policy.describe()}")
@@ -0,0 +1,66 @@
+from collections import deque
+import numpy as np
+from synthetic_data import FEATURE_COLUMNS
+
+# Observation layout: one row per approach (APPROACHES order), one column per
+# feature. The synthetic multi-feature dataset uses the same feature columns.
+FEATURES = FEATURE_COLUMNS
+APPROACHES = ('input_north', 'input_south', 'input_east', 'input_west')
+ARRIVAL_WINDOW = 60.0  # Seconds of history for the arrival rate
+
+
+class FeatureExtractor:
+    # Builds a fixed-shape (approaches, features) observation from the car
+    # arrays in one vectorized pass. The returned array is reused between
+    # calls; copy it if it has to outlive the next observe().
+
+    def __init__(self, lanes, car_length, signal_approaches, start_time=0.0, window=ARRIVAL_WINDOW):
+        rects = [lanes[key] for key in APPROACHES]
+        self.left = np.array([r.left for r in rects], dtype=np.float32)
+        self.right = np.array([r.right for r in rects], dtype=np.float32)
+        self.top = np.array([r.top for r in rects], dtype=np.float32)
+        self.bottom = np.array([r.bottom for r in rects], dtype=np.float32)
+        # Cars that fit bumper to bumper on each approach lane
+        self.capacity = np.array([max(r.w, r.h) // car_length for r in rects], dtype=np.float32)
+        # Signal controlling each approach
+        self.approach_signal = np.array([signal_approaches.index(key) for key in APPROACHES])
+        self.window = window
+        # (time, cumulative arrivals per approach), oldest first
+        self.arrival_history = deque([(start_time, np.zeros(len(APPROACHES)))])
+        self.observation = np.zeros((len(APPROACHES), len(FEATURES)), dtype=np.float32)
+
+    def observe(self, game):
+        now = game.now()
+        n_approaches = len(APPROACHES)
+        xs, ys, _, stopped = game._car_arrays()
+        waits = game._car_wait_array()
+
+        # Which approach lane each car is on, -1 for none (output lanes, box)
+        inside = ((xs[:, None] >= self.left) & (xs[:, None] < self.right)
+                  & (ys[:, None] >= self.top) & (ys[:, None] < self.bottom))
+        approach = np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+        on_approach = approach >= 0
+        ids = approach[on_approach]
+        queued = stopped[on_approach]
+
+        present = np.bincount(ids, minlength=n_approaches)
+        queue = np.bincount(ids[queued], minlength=n_approaches)
+        wait_sum = np.bincount(ids[queued], weights=waits[on_approach][queued], minlength=n_approaches)
+
+        # Arrivals over the trailing window, or a little more if observe()
+        # is not called often
+        self.arrival_history.append((now, game.arrivals.copy()))
+        while now - self.arrival_history[1][0] >= self.window:
+            self.arrival_history.popleft()
+        start_time, start_arrivals = self.arrival_history[0]
+        elapsed = now - start_time
+        arrival_rate = (game.arrivals - start_arrivals) / elapsed if elapsed > 0 else np.zeros(n_approaches)
+
+        obs = self.observation
+        obs[:, 0] = queue
+        obs[:, 1] = np.minimum(present / self.capacity, 1.0)
+        obs[:, 2] = arrival_rate
+        obs[:, 3] = np.divide(wait_sum, queue, out=np.zeros(n_approaches), where=queue > 0)
+        obs[:, 4] = now - game.red_since[self.approach_signal]
+        obs[self.approach_signal == game.current_signal_index, 4] = 0.0  # Green right now
+        return obs
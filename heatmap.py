@@ -0,0 +1,71 @@
+import numpy as np
+import pygame
+
+HEATMAP_MODES = ('occupancy', 'stop_time')
+HEATMAP_ALPHA = 160
+
+
+def _colormap():
+    # 256 entry yellow -> orange -> dark red lookup table
+    t = np.linspace(0, 1, 256)
+    lut = np.empty((256, 3), dtype=np.uint8)
+    lut[:, 0] = 255 - 115 * t
+    lut[:, 1] = 230 * (1 - t) ** 1.5
+    lut[:, 2] = 40 * (1 - t)
+    lut[0] = 0  # Empty cells map to the transparent colorkey
+    return lut
+
+
+class Heatmap:
+    # Time-integrated vehicle occupancy and stop time on a grid of `cell`
+    # pixel squares. Accumulation is one np.add.at per tick; the overlay
+    # surface is only rebuilt every `refresh_every` ticks.
+
+    def __init__(self, size, cell, dt, refresh_every=20):
+        self.size = size
+        self.cell = cell
+        self.dt = dt  # Seconds represented by one tick
+        self.refresh_every = refresh_every
+        self.visible = True
+        self.mode = 'stop_time'
+        cols = -(-size[0] // cell)
+        rows = -(-size[1] // cell)
+        self.occupancy = np.zeros((rows, cols))
+        self.stop_time = np.zeros((rows, cols))
+        self.ticks = 0
+        self._lut = _colormap()
+        self._overlay = None
+        self._overlay_tick = -1
+
+    def accumulate(self, xs, ys, stopped):
+        self.ticks += 1
+        if not len(xs):
+            return
+        rows, cols = self.occupancy.shape
+        r = np.clip(ys // self.cell, 0, rows - 1).astype(np.intp)
+        c = np.clip(xs // self.cell, 0, cols - 1).astype(np.intp)
+        np.add.at(self.occupancy, (r, c), self.dt)
+        np.add.at(self.stop_time, (r[stopped], c[stopped]), self.dt)
+
+    def _render(self, mode):
+        values = self.occupancy if mode == 'occupancy' else self.stop_time
+        scaled = np.log1p(values)
+        peak = scaled.max()
+        if peak > 0:
+            index = (scaled * (254 / peak)).astype(np.uint8) + (values > 0)
+        else:
+            index = np.zeros(values.shape, dtype=np.uint8)
+        rgb = self._lut[index]  # (rows, cols, 3)
+        surface = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+        return pygame.transform.scale(surface, self.size)
+
+    def overlay(self):
+        if self._overlay is None or self.ticks - self._overlay_tick >= self.refresh_every:
+            self._overlay = self._render(self.mode)
+            self._overlay.set_colorkey((0, 0, 0))
+            self._overlay.set_alpha(HEATMAP_ALPHA)
+            self._overlay_tick = self.ticks
+        return self._overlay
+
+    def save(self, path, mode=None):
+        pygame.image.save(self._render(mode or self.mode), path)
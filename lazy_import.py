@@ -0,0 +1,19 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    # Return module `name` without executing it; the real import happens on
+    # first attribute access. Later `import name` statements get the same
+    # module object from sys.modules.
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
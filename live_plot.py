@@ -0,0 +1,93 @@
+import time
+import matplotlib.pyplot as plt
+from metric_series import MetricSeries
+
+PLOT_INTERVAL = 0.5  # Redraw the metrics at most twice a second
+
+
+class LivePlot:
+    # Live reward / cars passed plot. Lines are updated in place and blitted
+    # over a cached background, and only new generations are appended. The
+    # history is downsampled to the axes width, keeping the extremes of each
+    # bucket, so a redraw costs the same after a day of generations as after
+    # ten and outliers stay visible.
+
+    def __init__(self, interval=PLOT_INTERVAL):
+        self.interval = interval
+        self.rewards = MetricSeries()
+        self.cars_passed = MetricSeries()
+        self.n_seen = 0
+        self.last_draw = 0
+        self.background = None
+
+        plt.ion()
+        self.fig, self.ax = plt.subplots()  # Initialize Matplotlib figure and axis
+        self.reward_line, = self.ax.plot([], [], label='Reward per Generation', color='red',
+                                         marker='o', linestyle='-', animated=True)
+        self.cars_line, = self.ax.plot([], [], label='Cars Passed per Generation', color='blue',
+                                       marker='o', linestyle='-', animated=True)
+        self.ax.set_xlabel('Generation')
+        self.ax.set_ylabel('Number of Cars Passed / Reward')
+        self.ax.legend()
+        self.ax.set_xlim(0, 10)
+        self.ax.set_ylim(-10, 10)
+
+        # Every full redraw (first show, resize, rescale) refreshes the background
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        plt.show(block=False)
+        self.fig.canvas.draw()
+
+    def _on_draw(self, event):
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        self.ax.draw_artist(self.reward_line)
+        self.ax.draw_artist(self.cars_line)
+
+    def _rescale(self):
+        # Grow the limits with headroom so full redraws stay rare
+        x_min, x_max = self.ax.get_xlim()
+        y_min, y_max = self.ax.get_ylim()
+        last_x = self.rewards.raw_x.view()[-1]
+        low = min(self.rewards.y_min, self.cars_passed.y_min)
+        high = max(self.rewards.y_max, self.cars_passed.y_max)
+        rescale = False
+        if last_x > x_max:
+            x_max = last_x * 2
+            rescale = True
+        if low < y_min:
+            y_min = low - (y_max - low) * 0.5
+            rescale = True
+        if high > y_max:
+            y_max = high + (high - y_min) * 0.5
+            rescale = True
+        if rescale:
+            self.ax.set_xlim(x_min, x_max)
+            self.ax.set_ylim(y_min, y_max)
+        return rescale
+
+    def update(self, data):
+        # Only look at generations we have not plotted yet
+        for d in data[self.n_seen:]:
+            self.rewards.append(d['generation'], d['reward'])
+            self.cars_passed.append(d['generation'], d['cars_passed'])
+        self.n_seen = len(data)
+
+        now = time.time()
+        if now - self.last_draw < self.interval:
+            return
+        self.last_draw = now
+
+        canvas = self.fig.canvas
+        if len(self.rewards):
+            width = max(int(self.ax.bbox.width), 3)  # Axes width in pixels
+            self.reward_line.set_data(*self.rewards.view(width))
+            self.cars_line.set_data(*self.cars_passed.view(width))
+            if self._rescale():
+                canvas.draw()  # Full redraw, _on_draw recaptures the background
+        if self.background is not None:
+            canvas.restore_region(self.background)
+            self._draw_lines()
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()  # Handle GUI events without sleeping like plt.pause
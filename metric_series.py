@@ -0,0 +1,143 @@
+import numpy as np
+
+BUCKET_FACTOR = 4  # Each level aggregates 4x more samples than the one below
+
+
+class _Column:
+    # Append-only float64 array with amortized O(1) growth
+    def __init__(self, capacity=64):
+        self.values = np.empty(capacity)
+        self.n = 0
+
+    def append(self, value):
+        if self.n == len(self.values):
+            self.values = np.resize(self.values, 2 * len(self.values))
+        self.values[self.n] = value
+        self.n += 1
+
+    def view(self):
+        return self.values[:self.n]
+
+
+class _Level:
+    # Fixed-size buckets of `size` raw samples: mean x plus min/max/mean of y.
+    # The open bucket is kept as running sums so the newest data is visible.
+    def __init__(self, size):
+        self.size = size
+        self.x = _Column()
+        self.y_min = _Column()
+        self.y_max = _Column()
+        self.y_mean = _Column()
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self.x_sum = 0.0
+        self.y_sum = 0.0
+        self.lo = np.inf
+        self.hi = -np.inf
+
+    def add(self, x, y):
+        self.count += 1
+        self.x_sum += x
+        self.y_sum += y
+        self.lo = min(self.lo, y)
+        self.hi = max(self.hi, y)
+        if self.count == self.size:
+            self.x.append(self.x_sum / self.count)
+            self.y_min.append(self.lo)
+            self.y_max.append(self.hi)
+            self.y_mean.append(self.y_sum / self.count)
+            self._reset()
+
+    def __len__(self):
+        return self.x.n + (1 if self.count else 0)
+
+    def arrays(self):
+        x, y_min, y_max, y_mean = (self.x.view(), self.y_min.view(),
+                                   self.y_max.view(), self.y_mean.view())
+        if self.count:
+            x = np.append(x, self.x_sum / self.count)
+            y_min = np.append(y_min, self.lo)
+            y_max = np.append(y_max, self.hi)
+            y_mean = np.append(y_mean, self.y_sum / self.count)
+        return x, y_min, y_max, y_mean
+
+
+def lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets downsampling to n_out points
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    edges[-1] = n - 1
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Twice the triangle area between the last pick, each candidate and the next bucket average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+
+class MetricSeries:
+    # Multi-resolution history of one metric. Raw samples live in level 0 and
+    # every coarser level buckets BUCKET_FACTOR times more samples, so a view
+    # for a plot `n_points` wide only ever touches O(n_points) buckets.
+
+    def __init__(self, factor=BUCKET_FACTOR):
+        self.factor = factor
+        self.raw_x = _Column()
+        self.raw_y = _Column()
+        self.levels = []
+        self.y_min = np.inf
+        self.y_max = -np.inf
+
+    def __len__(self):
+        return self.raw_x.n
+
+    def append(self, x, y):
+        self.raw_x.append(x)
+        self.raw_y.append(y)
+        self.y_min = min(self.y_min, y)
+        self.y_max = max(self.y_max, y)
+        if len(self) == self.factor ** (len(self.levels) + 1):
+            self.levels.append(_Level(self.factor ** (len(self.levels) + 1)))
+            # A new level starts with the samples it would already have seen
+            level = self.levels[-1]
+            for px, py in zip(self.raw_x.view()[:-1], self.raw_y.view()[:-1]):
+                level.add(px, py)
+        for level in self.levels:
+            level.add(x, y)
+
+    def _level_for(self, n_points):
+        # Finest level with at most factor * n_points buckets, None for raw
+        if len(self) <= n_points * self.factor:
+            return None
+        for level in self.levels:
+            if len(level) <= n_points * self.factor:
+                return level
+        return self.levels[-1]
+
+    def view(self, n_points):
+        # Downsampled (x, y) for a plot n_points wide
+        level = self._level_for(n_points)
+        if level is None:
+            x, y = self.raw_x.view(), self.raw_y.view()
+        else:
+            # Both extremes of every bucket rather than its mean, so spikes
+            # stay visible however coarse the level
+            x, y_min, y_max, _ = level.arrays()
+            x = np.repeat(x, 2)
+            y = np.column_stack([y_min, y_max]).ravel()
+        return lttb(x, y, n_points)
@@ -0,0 +1,39 @@
+import numpy as np
+
+# Compact, pickle-free storage for linear controller models: an .npz holding
+# the coefficient vector and intercept. Loading needs NumPy only.
+
+FORMAT_VERSION = 1
+
+
+class LinearModel:
+    # Drop-in for a fitted sklearn LinearRegression at inference time
+
+    def __init__(self, coef, intercept):
+        self.coef_ = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept_ = float(intercept)
+
+    @property
+    def n_features_in_(self):
+        return len(self.coef_)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.coef_))
+        return X @ self.coef_ + self.intercept_
+
+
+def save_linear(model, file):
+    # `file` is a path or an open binary file
+    np.savez(file, kind='linear', format_version=FORMAT_VERSION,
+             coef=np.ravel(model.coef_).astype(np.float64),
+             intercept=np.float64(np.ravel(model.intercept_)[0]))
+
+
+def load_linear(path):
+    with np.load(path) as data:
+        if str(data['kind']) != 'linear':
+            raise ValueError(f"{path} does not hold a linear model")
+        if int(data['format_version']) > FORMAT_VERSION:
+            raise ValueError(f"{path} uses model format {int(data['format_version'])}, "
+                             f"this code reads up to {FORMAT_VERSION}")
+        return LinearModel(data['coef'], data['intercept'])
@@ -0,0 +1,172 @@
+import fcntl
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from model_format import save_linear, load_linear
+
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+LEGACY_MODEL_FILE = 'model.pkl'
+BEST_METRIC = 'reward'  # Higher is better
+
+
+def atomic_write(path, write):
+    # Write through a temporary file in the same directory and rename it over
+    # `path`, so readers only ever see the old or the complete new file
+    # The temporary file is created 0666 less the umask, like open() would,
+    # so processes running as other users can read the registry
+    tmp_path = os.path.join(os.path.dirname(path) or '.', f'.tmp-{os.urandom(8).hex()}')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    # Versioned model files plus a small index.json recording, per version,
+    # the file name, metrics, timestamp and SHA-256, as well as which version
+    # is the latest and which is the best. Lookups read the index only.
+    # Changes re-read the index under a lock on index.lock and merge into it,
+    # so registries in several processes never hand out the same version.
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.lock_path = os.path.join(root, LOCK_FILE)
+        self.index = self._read_index()
+        if self.index['versions'] and not os.path.exists(self.index_path):
+            try:
+                with self._locked():
+                    if os.path.exists(self.index_path):
+                        self.index = self._read_index()  # Another process got there first
+                    else:
+                        self._write_index()
+            except OSError:
+                pass  # Read-only model directory, keep the index in memory
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                return json.load(f)
+        index = {'latest': None, 'best': None, 'next': 0, 'versions': {}}
+        legacy_path = os.path.join(self.root, LEGACY_MODEL_FILE)
+        if os.path.exists(legacy_path):
+            # Adopt a model.pkl written before the registry existed as version 0
+            index['versions']['0'] = {
+                'file': LEGACY_MODEL_FILE,
+                'metrics': {},
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(os.path.getmtime(legacy_path))),
+                'sha256': file_hash(legacy_path),
+            }
+            index['latest'] = 0
+            index['next'] = 1
+        return index
+
+    def _write_index(self):
+        data = json.dumps(self.index, indent=2).encode()
+        atomic_write(self.index_path, lambda f: f.write(data))
+
+    @property
+    def latest(self):
+        return self.index['latest']
+
+    @property
+    def best(self):
+        return self.index['best']
+
+    def resolve(self, version='latest'):
+        # 'latest', 'best' or an explicit version number
+        if version in ('latest', 'best'):
+            resolved = self.index[version]
+            if resolved is None and version == 'best':
+                resolved = self.index['latest']
+            if resolved is None:
+                raise LookupError(f"No models registered in {self.root}")
+            return resolved
+        version = int(version)
+        if str(version) not in self.index['versions']:
+            raise LookupError(f"Model version {version} is not registered in {self.root}")
+        return version
+
+    def entry(self, version='latest'):
+        return self.index['versions'][str(self.resolve(version))]
+
+    def path(self, version='latest'):
+        return os.path.join(self.root, self.entry(version)['file'])
+
+    def load(self, version='latest'):
+        version = self.resolve(version)
+        entry = self.entry(version)
+        path = os.path.join(self.root, entry['file'])
+        if path.endswith('.npz'):
+            return load_linear(path)
+
+        # Pickled model from before the compact format: load it once with
+        # joblib and point the entry at an .npz copy, so later starts skip
+        # importing joblib and sklearn
+        import joblib
+        model = joblib.load(path)
+        file_name = f'model.v{version}.npz'
+        npz_path = os.path.join(self.root, file_name)
+        try:
+            with self._locked():
+                atomic_write(npz_path, lambda f: save_linear(model, f))
+                self.index = self._read_index()
+                entry = self.index['versions'][str(version)]
+                entry['file'] = file_name
+                entry['sha256'] = file_hash(npz_path)
+                self._write_index()
+        except OSError:
+            pass  # Read-only model directory, keep using the pickle
+        return load_linear(npz_path) if entry['file'] == file_name else model
+
+    def register(self, model, metrics=None):
+        metrics = metrics or {}
+        with self._locked():
+            # Versions registered elsewhere since this registry last looked count too
+            self.index = self._read_index()
+            version = self.index['next']
+            file_name = f'model.v{version}.npz'
+            path = os.path.join(self.root, file_name)
+            atomic_write(path, lambda f: save_linear(model, f))
+
+            self.index['versions'][str(version)] = {
+                'file': file_name,
+                'metrics': metrics,
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'sha256': file_hash(path),
+            }
+            self.index['next'] = version + 1
+            self.index['latest'] = version
+            best = self.index['best']
+            if BEST_METRIC in metrics and (
+                    best is None or metrics[BEST_METRIC] > self.index['versions'][str(best)]['metrics'].get(BEST_METRIC, float('-inf'))):
+                self.index['best'] = version
+            self._write_index()
+        return version
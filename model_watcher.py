@@ -0,0 +1,87 @@
+import os
+import threading
+import numpy as np
+from model_registry import ModelRegistry, INDEX_FILE, file_hash
+
+POLL_INTERVAL = 2.0  # Seconds between checks of the registry index
+PROBE_COUNTS = np.arange(0, 21, dtype=np.float64)  # Vehicle counts a valid model must handle
+
+
+def validate_model(model, n_features):
+    # Reject models the simulation cannot run before they get anywhere near it
+    coef = np.ravel(model.coef_)
+    if len(coef) != n_features:
+        raise ValueError(f"Model has {len(coef)} features, expected {n_features}")
+    if not (np.all(np.isfinite(coef)) and np.isfinite(np.ravel(model.intercept_)[0])):
+        raise ValueError('Model weights are not finite')
+    if not np.all(np.isfinite(model.predict(np.repeat(PROBE_COUNTS[:, None], n_features, axis=1)))):
+        raise ValueError('Model predictions are not finite')
+
+
+class ModelWatcher:
+    # Watches a model registry for a new version of `version` ('latest',
+    # 'best' or a number) on a background thread: polls the index mtime, and
+    # on a change checks the file hash, loads and validates the model, then
+    # leaves it in `pending` for the simulation to take() at a convenient
+    # moment. A bad model is reported in `error` and the old one stays.
+
+    def __init__(self, root, version, current_version, n_features, interval=POLL_INTERVAL):
+        self.root = root
+        self.version = version
+        self.loaded_version = current_version
+        self.n_features = n_features
+        self.interval = interval
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.lock = threading.Lock()
+        self.pending = None  # (version, model) waiting to be swapped in
+        self.error = None
+        self.reloads = 0
+        self.stopped = threading.Event()
+        self.last_mtime = self._mtime()
+        self.thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+        self.thread.start()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.index_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            mtime = self._mtime()
+            if mtime == self.last_mtime:
+                continue
+            self.last_mtime = mtime
+            try:
+                self.check()
+            except Exception as exc:
+                self.error = exc
+
+    def check(self):
+        registry = ModelRegistry(self.root)
+        version = registry.resolve(self.version)
+        if version == self.loaded_version:
+            return False
+        entry = registry.entry(version)
+        if file_hash(registry.path(version)) != entry['sha256']:
+            raise ValueError(f"Model version {version} does not match its recorded hash")
+        model = registry.load(version)
+        validate_model(model, self.n_features)
+        with self.lock:
+            self.pending = (version, model)
+        self.loaded_version = version
+        self.error = None
+        return True
+
+    def take(self):
+        # The newest validated (version, model), or None
+        with self.lock:
+            pending, self.pending = self.pending, None
+        if pending is not None:
+            self.reloads += 1
+        return pending
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
@@ -0,0 +1,63 @@
+import numpy as np
+
+FORGETTING = 0.999  # Weight of past samples after one more update
+PRIOR_VARIANCE = 1e-3  # Initial P = PRIOR_VARIANCE * I around the starting weights
+MAX_TRACE = 1e3  # Cap on trace(P) so rarely excited directions cannot blow up
+
+
+class RecursiveLeastSquares:
+    # Online linear regression y ~ x @ coef + intercept. Each sample costs
+    # O(features^2) and the state is just the weights and the inverse
+    # correlation matrix P, so learning is cumulative with bounded memory.
+
+    def __init__(self, n_features, forgetting=FORGETTING, prior_variance=PRIOR_VARIANCE, max_trace=MAX_TRACE):
+        self.forgetting = forgetting
+        self.max_trace = max_trace
+        self.w = np.zeros(n_features + 1)  # Last entry is the intercept
+        self.P = np.eye(n_features + 1) * prior_variance
+        self.n_updates = 0
+
+    @classmethod
+    def from_model(cls, model, **kwargs):
+        # Continue learning from a fitted sklearn-style linear model
+        coef = np.ravel(model.coef_)
+        learner = cls(len(coef), **kwargs)
+        learner.w[:-1] = coef
+        learner.w[-1] = float(np.ravel(model.intercept_)[0])
+        return learner
+
+    @property
+    def coef_(self):
+        return self.w[:-1]
+
+    @property
+    def intercept_(self):
+        return self.w[-1]
+
+    def update(self, x, y):
+        phi = np.append(np.asarray(x, dtype=np.float64).ravel(), 1.0)
+        P_phi = self.P @ phi
+        gain = P_phi / (self.forgetting + phi @ P_phi)
+        self.w += gain * (y - self.w @ phi)
+        P = (self.P - np.outer(gain, P_phi)) / self.forgetting
+        P = (P + P.T) * 0.5  # Keep P symmetric despite rounding
+        trace = np.trace(P)
+        if trace > self.max_trace:
+            P *= self.max_trace / trace
+        self.P = P
+        self.n_updates += 1
+
+    def partial_fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64).reshape(len(y), -1)
+        for x_row, y_row in zip(X, np.asarray(y, dtype=np.float64)):
+            self.update(x_row, y_row)
+        return self
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.coef_))
+        return X @ self.coef_ + self.intercept_
+
+    def apply_to(self, model):
+        # Copy the learned weights into a fitted sklearn LinearRegression
+        model.coef_ = self.coef_.copy()
+        model.intercept_ = float(self.intercept_)
@@ -0,0 +1,131 @@
+import argparse
+import numpy as np
+from model_registry import atomic_write
+
+# Trained policies exported to plain NumPy arrays in one .npz, plus forward
+# functions that need nothing but NumPy. Exporting reads the fitted
+# attributes of the source object (sklearn estimators included) without
+# importing its framework.
+
+POLICY_KINDS = ('linear', 'mlp', 'q_table')
+ACTIVATIONS = {
+    'identity': lambda h: h,
+    'relu': lambda h: np.maximum(h, 0, out=h),
+    'tanh': lambda h: np.tanh(h, out=h),
+    'logistic': lambda h: np.divide(1.0, np.add(np.exp(np.negative(h, out=h), out=h), 1.0, out=h), out=h),
+}
+
+
+def export_policy(source):
+    # LinearRegression / LinearModel, MLPRegressor or QLearningController -> dict of arrays
+    if hasattr(source, 'q') and hasattr(source, 'encode'):
+        from q_learning import QUEUE_EDGES, ELAPSED_EDGES, DURATIONS
+        return {'kind': np.array('q_table'), 'q': np.asarray(source.q, dtype=np.float64),
+                'queue_edges': QUEUE_EDGES.astype(np.float64), 'elapsed_edges': ELAPSED_EDGES.astype(np.float64),
+                'radix': source._radix.astype(np.int64), 'durations': DURATIONS.astype(np.float64)}
+    if hasattr(source, 'coefs_'):
+        if source.out_activation_ not in ('identity', 'logistic') or source.activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported MLP activations {source.activation!r} / {source.out_activation_!r}")
+        policy = {'kind': np.array('mlp'), 'activation': np.array(source.activation),
+                  'out_activation': np.array(source.out_activation_), 'n_layers': np.array(len(source.coefs_))}
+        for i, (weights, bias) in enumerate(zip(source.coefs_, source.intercepts_)):
+            policy[f'W{i}'] = np.ascontiguousarray(weights, dtype=np.float64)
+            policy[f'b{i}'] = np.asarray(bias, dtype=np.float64)
+        return policy
+    if hasattr(source, 'coef_'):
+        return {'kind': np.array('linear'), 'coef': np.ravel(source.coef_).astype(np.float64),
+                'intercept': np.float64(np.ravel(source.intercept_)[0])}
+    raise TypeError(f"Cannot export {type(source).__name__}")
+
+
+def save_policy(policy, path):
+    atomic_write(path, lambda f: np.savez(f, **policy))
+
+
+def load_policy(path):
+    with np.load(path) as data:
+        policy = {name: data[name] for name in data.files}
+    if str(policy['kind']) not in POLICY_KINDS:
+        raise ValueError(f"{path} holds an unknown policy kind {str(policy['kind'])!r}")
+    return policy
+
+
+def compile_policy(policy):
+    # Single-observation forward function with its buffers preallocated:
+    #   linear:  f(x) -> float, x holds the features
+    #   mlp:     f(x) -> float (single output) or the output array
+    #   q_table: f(counts, elapsed, phase) -> (next phase, green duration)
+    kind = str(policy['kind'])
+    if kind == 'linear':
+        coef = policy['coef']
+        intercept = float(policy['intercept'])
+
+        def forward(x):
+            return float(np.dot(x, coef)) + intercept
+        return forward
+
+    if kind == 'mlp':
+        n_layers = int(policy['n_layers'])
+        layers = [(policy[f'W{i}'], policy[f'b{i}']) for i in range(n_layers)]
+        buffers = [np.empty(weights.shape[1]) for weights, _ in layers]
+        activations = [ACTIVATIONS[str(policy['activation'])]] * (n_layers - 1) + [ACTIVATIONS[str(policy['out_activation'])]]
+
+        def forward(x):
+            h = x
+            for (weights, bias), out, activation in zip(layers, buffers, activations):
+                h = activation(np.add(np.dot(h, weights, out=out), bias, out=out))
+            return float(h[0]) if len(h) == 1 else h
+        return forward
+
+    q = policy['q']
+    queue_edges = policy['queue_edges']
+    elapsed_edges = policy['elapsed_edges']
+    queue_radix = policy['radix'][:-2]
+    elapsed_radix, phase_radix = (int(r) for r in policy['radix'][-2:])
+    durations = policy['durations'].tolist()
+    n_durations = len(durations)
+
+    def forward(counts, elapsed, phase):
+        state = (int(np.dot(np.searchsorted(queue_edges, counts, side='right'), queue_radix))
+                 + int(np.searchsorted(elapsed_edges, elapsed, side='right')) * elapsed_radix
+                 + phase * phase_radix)
+        action = int(q[state].argmax())
+        return action // n_durations, durations[action % n_durations]
+    return forward
+
+
+def forward_batch(policy, X):
+    # Vectorized forward pass for linear and MLP policies, X of shape (n, features)
+    kind = str(policy['kind'])
+    X = np.asarray(X, dtype=np.float64)
+    if kind == 'linear':
+        return X @ policy['coef'] + float(policy['intercept'])
+    if kind == 'mlp':
+        n_layers = int(policy['n_layers'])
+        h = X
+        for i in range(n_layers):
+            activation = policy['activation'] if i < n_layers - 1 else policy['out_activation']
+            h = ACTIVATIONS[str(activation)](h @ policy[f'W{i}'] + policy[f'b{i}'])
+        return h[:, 0] if h.shape[1] == 1 else h
+    raise ValueError(f"forward_batch does not apply to {kind} policies")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export a trained policy to a NumPy-only .npz')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--model-version', help="registered model: 'latest', 'best' or a version number")
+    source.add_argument('--q-table', metavar='PATH', help='Q-table written by q_learning.py')
+    parser.add_argument('--model-dir', default=None, help='model registry directory (default: as simulation.py)')
+    parser.add_argument('--out', default='policy.npz')
+    args = parser.parse_args()
+
+    if args.q_table:
+        from q_learning import QLearningController
+        trained = QLearningController.load(args.q_table)
+    else:
+        from model_registry import ModelRegistry
+        from simulation import MODEL_DIR
+        trained = ModelRegistry(args.model_dir or MODEL_DIR).load(args.model_version)
+    exported = export_policy(trained)
+    save_policy(exported, args.out)
+    print(f"Saved {str(exported['kind'])} policy to {args.out}")
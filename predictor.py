@@ -0,0 +1,21 @@
+import numpy as np
+
+
+class LinearPredictor:
+    # Closed-form evaluation of a fitted linear model, y = X @ coef + intercept,
+    # without going through sklearn's input validation on every call.
+
+    def __init__(self, coef, intercept):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(np.ravel(intercept)[0])
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(model.coef_, model.intercept_)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            # One scalar feature per row, like the per-approach vehicle counts
+            return X * self.coef[0] + self.intercept
+        return X @ self.coef + self.intercept
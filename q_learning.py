@@ -0,0 +1,144 @@
+import argparse
+import numpy as np
+from controllers import SignalController
+
+# State: queue level of each approach, how long the current phase has been
+# green, and which phase that is. Action: next phase and its green duration.
+QUEUE_EDGES = np.array([1, 3, 6, 10])  # 5 queue levels per approach
+ELAPSED_EDGES = np.array([5, 10, 15])  # 4 elapsed green levels, in seconds
+DURATIONS = np.array([5.0, 10.0, 15.0])  # Green durations to choose from
+N_PHASES = 4
+COUNTER_KEYS = ('input_north', 'input_south', 'input_east', 'input_west')
+
+ALPHA = 0.1
+GAMMA = 0.9
+EPSILON = 0.1
+WAIT_PENALTY = 0.1  # Reward lost per stopped car at decision time
+
+
+class QLearningController(SignalController):
+    # Tabular Q-learning over discretized queue states. Plugs into
+    # CarGame(controller=...) and is asked for the next phase each time the
+    # current green runs out; when `learning` is on it updates the table from
+    # the reward collected since its previous decision.
+
+    def __init__(self, alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON, seed=None):
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.learning = True
+        self.rng = np.random.RandomState(seed)
+
+        n_queue = len(QUEUE_EDGES) + 1
+        n_elapsed = len(ELAPSED_EDGES) + 1
+        self.n_states = n_queue ** 4 * n_elapsed * N_PHASES
+        self.n_actions = N_PHASES * len(DURATIONS)
+        self.q = np.zeros((self.n_states, self.n_actions))
+        # Mixed radix weights for (north, south, east, west, elapsed, phase)
+        self._radix = np.array([n_queue ** 3 * n_elapsed * N_PHASES, n_queue ** 2 * n_elapsed * N_PHASES,
+                                n_queue * n_elapsed * N_PHASES, n_elapsed * N_PHASES, N_PHASES, 1])
+        self.reset()
+
+    def reset(self):
+        # Forget the pending transition, e.g. at the start of a new episode
+        self.last_state = None
+        self.last_action = None
+        self.last_passed = 0
+
+    def encode(self, counts, elapsed, phase):
+        # Works on single states and on batches: counts (..., 4), elapsed (...), phase (...)
+        digits = np.concatenate([
+            np.digitize(counts, QUEUE_EDGES),
+            np.digitize(elapsed, ELAPSED_EDGES)[..., None],
+            np.asarray(phase)[..., None],
+        ], axis=-1)
+        return digits @ self._radix
+
+    def act(self, state):
+        if self.learning and self.rng.rand() < self.epsilon:
+            return self.rng.randint(self.n_actions)
+        return int(np.argmax(self.q[state]))
+
+    def update(self, states, actions, rewards, next_states):
+        # One vectorized Q-learning step for a batch of transitions
+        targets = rewards + self.gamma * self.q[next_states].max(axis=1)
+        td_error = targets - self.q[states, actions]
+        np.add.at(self.q, (states, actions), self.alpha * td_error)
+
+    def decide(self, game):
+        counts = np.array([game.counters[key] for key in COUNTER_KEYS])
+        elapsed = game.now() - game.last_switch_time
+        state = int(self.encode(counts, elapsed, game.current_signal_index))
+
+        if self.learning and self.last_state is not None:
+            passed = game.total_cars_passed - self.last_passed
+            reward = passed - WAIT_PENALTY * game.calculate_waiting_time()
+            self.update(np.array([self.last_state]), np.array([self.last_action]),
+                        np.array([reward]), np.array([state]))
+
+        action = self.act(state)
+        self.last_state = state
+        self.last_action = action
+        self.last_passed = game.total_cars_passed
+        return action // len(DURATIONS), float(DURATIONS[action % len(DURATIONS)])
+
+    def state_dict(self):
+        # The table and exploration RNG, plus the pending transition (-1 for none)
+        _, keys, pos, has_gauss, cached = self.rng.get_state()
+        return {
+            'q': self.q, 'epsilon': self.epsilon, 'learning': self.learning,
+            'rng_keys': keys, 'rng_pos': pos, 'rng_gauss': np.array([has_gauss, cached]),
+            'last_state': -1 if self.last_state is None else self.last_state,
+            'last_action': -1 if self.last_action is None else self.last_action,
+            'last_passed': self.last_passed,
+        }
+
+    def load_state_dict(self, state):
+        self.q[:] = state['q']
+        self.epsilon = float(state['epsilon'])
+        self.learning = bool(state['learning'])
+        has_gauss, cached = state['rng_gauss'].tolist()
+        self.rng.set_state(('MT19937', state['rng_keys'], int(state['rng_pos']), int(has_gauss), cached))
+        self.last_state = None if state['last_state'] < 0 else int(state['last_state'])
+        self.last_action = None if state['last_action'] < 0 else int(state['last_action'])
+        self.last_passed = int(state['last_passed'])
+
+    def save(self, path):
+        np.savez_compressed(path, q=self.q)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        controller = cls(**kwargs)
+        with np.load(path) as data:
+            controller.q[:] = data['q']
+        controller.learning = False
+        return controller
+
+
+def train(controller, episodes, steps, epsilon_decay=0.95, min_epsilon=0.01):
+    # Headless episodes on the simulated clock, as fast as the CPU allows
+    from simulation import CarGame
+    history = []
+    for episode in range(episodes):
+        game = CarGame(headless=True, realtime=False, controller=controller)
+        controller.reset()
+        for _ in range(steps):
+            game.play_step()
+        history.append(game.total_cars_passed)
+        print(f"Episode {episode + 1}/{episodes}: cars passed {game.total_cars_passed}, epsilon {controller.epsilon:.3f}")
+        controller.epsilon = max(min_epsilon, controller.epsilon * epsilon_decay)
+    return history
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the Q-learning signal controller headless')
+    parser.add_argument('--episodes', type=int, default=50)
+    parser.add_argument('--steps', type=int, default=12000, help='simulation steps per episode (20 per simulated second)')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default='q_table.npz')
+    args = parser.parse_args()
+
+    controller = QLearningController(seed=args.seed)
+    train(controller, args.episodes, args.steps)
+    controller.save(args.out)
+    print(f"Saved Q-table to {args.out}")
@@ -0,0 +1,87 @@
+import os
+import queue
+import threading
+import numpy as np
+import pygame
+
+RECORD_FORMATS = ('png', 'npz')
+
+
+class FrameRecorder:
+    # Records every `every`-th simulation tick to out_dir, either as a PNG
+    # sequence or as compressed NumPy chunks of `chunk_frames` frames.
+    #
+    # Frames are copied once into a surface from a fixed pool and that surface
+    # itself is handed to the writer thread, which encodes it and gives it back.
+    # If the writer falls behind and the pool is empty the frame is dropped, so
+    # a slow disk never stalls the simulation loop.
+
+    def __init__(self, out_dir, size, every=1, fmt='png', pool_size=8, chunk_frames=64):
+        if fmt not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format {fmt!r}, expected one of {RECORD_FORMATS}")
+        self.out_dir = out_dir
+        self.every = every
+        self.fmt = fmt
+        self.chunk_frames = chunk_frames
+        self.recorded = 0
+        self.dropped = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+        self.free = queue.Queue()
+        for _ in range(pool_size):
+            self.free.put(pygame.Surface(size))
+        self.pending = queue.Queue()
+
+        w, h = size
+        self.chunk = np.empty((chunk_frames, h, w, 3), dtype=np.uint8) if fmt == 'npz' else None
+        self.chunk_ticks = np.empty(chunk_frames, dtype=np.int64)
+        self.chunk_len = 0
+        self.chunk_index = 0
+
+        self.writer = threading.Thread(target=self._write_loop, name='frame-writer', daemon=True)
+        self.writer.start()
+
+    def capture(self, game):
+        if game.frame % self.every:
+            return
+        try:
+            surface = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        if game.headless:
+            game._draw()  # Headless runs only render the ticks we record
+        surface.blit(game.screen_properties.screen, (0, 0))
+        self.pending.put((game.frame, surface))
+        self.recorded += 1
+
+    def _write_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            tick, surface = item
+            if self.fmt == 'png':
+                pygame.image.save(surface, os.path.join(self.out_dir, f'frame_{tick:08d}.png'))
+            else:
+                pixels = pygame.surfarray.pixels3d(surface)  # (w, h, 3) view, no copy
+                self.chunk[self.chunk_len] = pixels.transpose(1, 0, 2)
+                del pixels  # Unlock the surface before it goes back to the pool
+                self.chunk_ticks[self.chunk_len] = tick
+                self.chunk_len += 1
+                if self.chunk_len == self.chunk_frames:
+                    self._flush_chunk()
+            self.free.put(surface)
+        if self.chunk_len:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        path = os.path.join(self.out_dir, f'frames_{self.chunk_index:05d}.npz')
+        np.savez_compressed(path, frames=self.chunk[:self.chunk_len], ticks=self.chunk_ticks[:self.chunk_len])
+        self.chunk_index += 1
+        self.chunk_len = 0
+
+    def close(self):
+        # Drain whatever is queued, then stop the writer
+        self.pending.put(None)
+        self.writer.join()
@@ -0,0 +1,73 @@
+import json
+import os
+import numpy as np
+
+FIELDS = ('observations', 'actions', 'rewards', 'next_observations')
+
+
+class ReplayBuffer:
+    # Fixed-capacity ring buffer of (observation, action, reward, next
+    # observation) transitions stored in preallocated NumPy arrays. With
+    # `path` the arrays are memory-mapped .npy files, so the buffer can be
+    # larger than RAM and is picked up again when reopened.
+
+    def __init__(self, capacity, obs_shape, act_shape, path=None):
+        self.capacity = capacity
+        self.path = path
+        self.pos = 0
+        self.size = 0
+        shapes = {
+            'observations': (capacity, *obs_shape),
+            'actions': (capacity, *act_shape),
+            'rewards': (capacity,),
+            'next_observations': (capacity, *obs_shape),
+        }
+        if path is None:
+            self.arrays = {name: np.zeros(shape, dtype=np.float32) for name, shape in shapes.items()}
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.created = False
+            self.arrays = {name: self._open(name, shape) for name, shape in shapes.items()}
+            meta_path = os.path.join(path, 'meta.json')
+            if os.path.exists(meta_path) and not self.created:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                self.pos, self.size = meta['pos'], meta['size']
+
+    def _open(self, name, shape):
+        file_path = os.path.join(self.path, f'{name}.npy')
+        if os.path.exists(file_path):
+            array = np.load(file_path, mmap_mode='r+')
+            if array.shape == shape and array.dtype == np.float32:
+                return array
+        self.created = True  # Old contents, if any, do not match; start empty
+        return np.lib.format.open_memmap(file_path, mode='w+', dtype=np.float32, shape=shape)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, observation, action, reward, next_observation):
+        i = self.pos
+        self.arrays['observations'][i] = observation
+        self.arrays['actions'][i] = action
+        self.arrays['rewards'][i] = reward
+        self.arrays['next_observations'][i] = next_observation
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size, rng=None):
+        # rng: a np.random.Generator, or a seed to create one from
+        if self.size == 0:
+            raise ValueError('Cannot sample from an empty replay buffer')
+        idx = np.random.default_rng(rng).integers(0, self.size, batch_size)
+        return {name: array[idx] for name, array in self.arrays.items()}
+
+    def flush(self):
+        if self.path is None:
+            return
+        for array in self.arrays.values():
+            array.flush()
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'pos': self.pos, 'size': self.size}, f)
+        os.replace(meta_path + '.tmp', meta_path)
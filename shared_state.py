@@ -0,0 +1,116 @@
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+
+# Shared-memory snapshot of the simulation, written by the simulation process
+# and read by any number of viewer processes.
+#
+# The block holds a small header followed by two state slots. The writer always
+# fills the slot that is not active and then flips `active`, so a reader never
+# sees a half written frame and the writer never waits for a reader.
+
+DEFAULT_SHM_NAME = 'traffic_state'
+MAX_CARS = 512
+NUM_SIGNALS = 4
+
+HEADER_DTYPE = np.dtype([
+    ('seq', 'u8'),      # number of published frames
+    ('active', 'u4'),   # index of the slot readers should use
+    ('alive', 'u4'),    # cleared when the simulation shuts down
+    ('width', 'u4'),
+    ('height', 'u4'),
+])
+
+SLOT_DTYPE = np.dtype([
+    ('n_cars', 'i4'),
+    ('generation', 'i4'),
+    ('cars_passed', 'i4'),
+    ('counters', 'i4', (4,)),  # north, south, east, west
+    ('signal_colors', 'u1', (NUM_SIGNALS, 3)),
+    ('cars', 'f4', (MAX_CARS, 4)),  # x, y, direction, stopped
+])
+
+COUNTER_KEYS = ('input_north', 'input_south', 'input_east', 'input_west')
+
+
+def _layout(buf):
+    header = np.ndarray((), dtype=HEADER_DTYPE, buffer=buf, offset=0)
+    slots = np.ndarray((2,), dtype=SLOT_DTYPE, buffer=buf, offset=HEADER_DTYPE.itemsize)
+    return header, slots
+
+
+class SharedState:
+    def __init__(self, name=DEFAULT_SHM_NAME, create=False, width=0, height=0):
+        size = HEADER_DTYPE.itemsize + 2 * SLOT_DTYPE.itemsize
+        self.owner = create
+        if create:
+            try:
+                # Drop a block left behind by a simulation that was killed
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Attaching registers the block with this process' resource tracker,
+            # which would unlink it when a viewer exits. Only the owner unlinks.
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        self.header, self.slots = _layout(self.shm.buf)
+        if create:
+            self.header['seq'] = 0
+            self.header['active'] = 0
+            self.header['alive'] = 1
+            self.header['width'] = width
+            self.header['height'] = height
+            self.slots['n_cars'] = 0
+
+    @property
+    def alive(self):
+        return bool(self.header['alive'])
+
+    @property
+    def size(self):
+        return int(self.header['width']), int(self.header['height'])
+
+    def publish(self, game):
+        index = 1 - int(self.header['active'])
+        slot = self.slots[index]
+
+        xs, ys, directions, stopped = game._car_arrays()
+        n = min(len(xs), MAX_CARS)
+        cars = slot['cars']
+        cars[:n, 0] = xs[:n]
+        cars[:n, 1] = ys[:n]
+        cars[:n, 2] = directions[:n]
+        cars[:n, 3] = stopped[:n]
+        slot['n_cars'] = n
+        slot['generation'] = game.generation
+        slot['cars_passed'] = game.cars_passed
+        slot['counters'] = [game.counters[key] for key in COUNTER_KEYS]
+        slot['signal_colors'] = [signal.color for signal in game.signals]
+
+        self.header['active'] = index
+        self.header['seq'] += 1
+
+    def read(self):
+        # Copy out the active slot. If the writer published while we were
+        # copying it may already be refilling our slot, so try again.
+        while True:
+            seq = int(self.header['seq'])
+            active = int(self.header['active'])
+            slot = self.slots[active:active + 1].copy()[0]
+            if int(self.header['seq']) == seq:
+                return seq, slot
+
+    def close(self):
+        if self.owner:
+            self.header['alive'] = 0
+        # Release the numpy views before closing the mapping
+        self.header = self.slots = None
+        self.shm.close()
+        if self.owner:
+            # A viewer started from this process shares our resource tracker and
+            # may have unregistered the block; register again so unlink is clean
+            resource_tracker.register(self.shm._name, 'shared_memory')
+            self.shm.unlink()
@@ -1,22 +1,49 @@
-import pygame
 import random
 from enum import Enum
 from collections import namedtuple
 import time
-import joblib
 import os
+import argparse
+import json
 import numpy as np
-from sklearn.linear_model import LinearRegression
-import matplotlib.pyplot as plt
+from lazy_import import lazy_import
+
+# Importing this module must stay cheap and free of side effects (worker
+# processes and tests import it), so pygame is only loaded on first use,
+# pygame.init() runs when a CarGame is created and fonts are opened when
+# something is first drawn. Matplotlib, sklearn and the optional tools are
+# imported where they are used.
+pygame = lazy_import('pygame')
+
+from camera import Camera, SpatialGrid, queue_color
+from predictor import LinearPredictor
+from online_learning import RecursiveLeastSquares
+from replay_buffer import ReplayBuffer
+from trainer import BackgroundTrainer
+from model_watcher import ModelWatcher
+from model_registry import ModelRegistry
+from synthetic_data import load_dataset
+from features import FeatureExtractor, APPROACHES, FEATURES
+
+_fonts = {}
+
+
+def get_font(size):
+    # Cached arial font, SysFont is far too slow to call every frame
+    if size not in _fonts:
+        pygame.font.init()
+        _fonts[size] = pygame.font.SysFont('arial', size)
+    return _fonts[size]
 
-pygame.init()
-font = pygame.font.SysFont('arial', 25)
 
 class Direction(Enum):
     RIGHT = 1
     LEFT = 2
     UP = 3
     DOWN = 4
+
+# Index in features.APPROACHES of the input lane a car spawned going this way uses
+DIRECTION_APPROACH = {Direction.DOWN: 0, Direction.UP: 1, Direction.LEFT: 2, Direction.RIGHT: 3}
     
 Point = namedtuple('Point', 'x, y')
 
@@ -34,6 +61,21 @@ BLOCK_SIZE = 20
 SPEED = 20
 STOPPING_DISTANCE = 25
 OFFSET = 50  # Define the offset distance
+REPLAY_CAPACITY = 100000  # Generations of experience kept for training
+VIEWER_EXIT_TIMEOUT = 2.0  # Seconds a --viewer process gets to close before it is killed
+# Model registry location and the version to run, overridable from the environment
+MODEL_DIR = os.environ.get('TRAFFIC_MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model'))
+MODEL_VERSION = os.environ.get('TRAFFIC_MODEL_VERSION', 'latest')
+
+# Signal position, size and name, in the order used by current_signal_index
+SIGNAL_LAYOUT = [
+    ((600, 350), (20, 100), 'Signal_West'),
+    ((820, 450), (20, 100), 'Signal_East'),
+    ((720, 330), (100, 20), 'Signal_North'),
+    ((620, 550), (100, 20), 'Signal_South')
+]
+# Input lane (counter) each signal controls, in SIGNAL_LAYOUT order
+SIGNAL_COUNTERS = ('input_west', 'input_east', 'input_north', 'input_south')
 
 class Signal:
     def __init__(self, screen, position, size, name):
@@ -46,8 +88,11 @@ class Signal:
         self.color_index = 0
         self.green_light_duration = 0  # Initialize green light duration
 
-    def draw(self):
-        pygame.draw.rect(self.screen, self.color, (*self.position, *self.size))
+    def draw(self, camera=None):
+        rect = pygame.Rect(*self.position, *self.size)
+        if camera is not None:
+            rect = camera.to_screen_rect(rect)
+        pygame.draw.rect(self.screen, self.color, rect)
 
     def handle_click(self, mouse_pos):
         rect = pygame.Rect(*self.position, *self.size)
@@ -60,6 +105,13 @@ class Intersection:
         self.screen = screen_properties.screen
         self.lanes = self.initialize_lanes()
         self.guide_lines_width = 7
+        # Spatial index of the road geometry, items are (lane key, colour) in draw order
+        self.grid = SpatialGrid()
+        for direction in ['north', 'south', 'east', 'west']:
+            self.grid.insert(self.lanes[f'input_{direction}'], (f'input_{direction}', ROAD_COLOR))
+            self.grid.insert(self.lanes[f'output_{direction}'], (f'output_{direction}', GREY))
+            self.grid.insert(self.lanes[f'guide_{direction}'], (f'guide_{direction}', WHITE))
+        self.grid.insert(self.lanes['intersection'], ('intersection', GREY))
 
     def initialize_lanes(self):
         # Define the lanes with specific coordinates
@@ -80,7 +132,10 @@ class Intersection:
         }
         return lanes
 
-    def draw(self):
+    def draw(self, camera=None, link_colors=None):
+        if camera is not None and not camera.is_identity:
+            self._draw_view(camera, link_colors or {})
+            return
         # Draw the lanes
         # North Lanes
         pygame.draw.rect(self.screen, ROAD_COLOR, self.lanes['input_north'])
@@ -108,14 +163,27 @@ class Intersection:
         # Draw Intersection White line
         pygame.draw.aalines(self.screen, BLACK, True, [(620, 350), (820, 350), (820, 550), (620, 550)])
 
+    def _draw_view(self, camera, link_colors):
+        # Only draw the geometry inside the viewport
+        for index in self.grid.query(camera.world_rect()):
+            rect, (key, color) = self.grid.items[index]
+            pygame.draw.rect(self.screen, link_colors.get(key, color), camera.to_screen_rect(rect))
+        outline = self.lanes['intersection']
+        if outline.colliderect(camera.world_rect()):
+            pygame.draw.rect(self.screen, BLACK, camera.to_screen_rect(outline), 1)
+
 class ScreenProperties:
-    def __init__(self, width, height, color, title):
+    def __init__(self, width, height, color, title, headless=False):
         self.width = width
         self.height = height
         self.color = color
         self.title = title
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption(self.title)
+        if headless:
+            # Offscreen surface, no window or display driver needed
+            self.screen = pygame.Surface((self.width, self.height))
+        else:
+            self.screen = pygame.display.set_mode((self.width, self.height))
+            pygame.display.set_caption(self.title)
 
     def fill(self):
         self.screen.fill(self.color)
@@ -127,11 +195,10 @@ class Button:
         self.size = size
         self.text = text
         self.color = GREY
-        self.font = pygame.font.SysFont('arial', 25)
         
     def draw(self):
         pygame.draw.rect(self.screen, self.color, (*self.position, *self.size))
-        text_surface = self.font.render(self.text, True, BLACK)
+        text_surface = get_font(25).render(self.text, True, BLACK)
         text_rect = text_surface.get_rect(center=(self.position[0] + self.size[0] // 2, self.position[1] + self.size[1] // 2))
         self.screen.blit(text_surface, text_rect)
         
@@ -143,28 +210,42 @@ class Button:
 
 class CarGame:
     
-    def __init__(self, w=1440, h=900):
+    def __init__(self, w=1440, h=900, headless=False, shared_state=None, replay_dir=None,
+                 realtime=True, controller=None, model_dir=MODEL_DIR, model_version=MODEL_VERSION,
+                 background_training=False, watch_model=False):
+        pygame.init()
         self.w = w
         self.h = h
-        self.screen_properties = ScreenProperties(self.w, self.h, L_GREEN, 'Traffic Simulation')
+        self.headless = headless
+        # With realtime=False every step advances a simulated clock by 1 / SPEED
+        # seconds instead of waiting for the wall clock, for fast training runs
+        self.realtime = realtime
+        self.sim_time = 0.0
+        # Optional controller choosing the next green phase and its duration,
+        # replaces the round-robin schedule with model predicted durations
+        self.controller = controller
+        self.shared_state = shared_state  # Optional SharedState read by viewer processes
+        self.recorder = None  # Optional FrameRecorder
+        self.heatmap = None  # Optional Heatmap of where cars queue
+        self.camera = Camera((self.w, self.h))
+        self.frame = 0
+        self.screen_properties = ScreenProperties(self.w, self.h, L_GREEN, 'Traffic Simulation', headless)
         self.intersection = Intersection(self.screen_properties)
         self.clock = pygame.time.Clock()
         
         # init game state
         self.cars = []
-        self.spawn_time = time.time()
+        self.spawn_time = self.now()
         
         # Initialize signals
         self.signals = [
-            Signal(self.screen_properties.screen, (600, 350), (20, 100), 'Signal_West'),  # Signal West
-            Signal(self.screen_properties.screen, (820, 450), (20, 100), 'Signal_East'),  # Signal East
-            Signal(self.screen_properties.screen, (720, 330), (100, 20), 'Signal_North'),  # Signal North
-            Signal(self.screen_properties.screen, (620, 550), (100, 20), 'Signal_South')  # Signal South
+            Signal(self.screen_properties.screen, position, size, name)
+            for position, size, name in SIGNAL_LAYOUT
         ]
         
         # Initialize start button
         self.start_button = Button(self.screen_properties.screen, (self.w - 150, 20), (120, 50), 'Start')
-        self.simulation_started = False
+        self.simulation_started = headless  # Nobody can press Start without a window
         
         # Initialize counters for each input lane
         self.counters = {
@@ -175,46 +256,66 @@ class CarGame:
         }
         
         # Load the trained model
+        self.registry = ModelRegistry(model_dir)
+        self.model_version = model_version
         self.model = self.load_or_create_model()
+        self.learner = RecursiveLeastSquares.from_model(self.model)  # Online updates on top of the initial fit
+        self._refresh_predictor()
+        # Fit on a worker thread instead of inside update_model, see trainer.py
+        self.trainer = BackgroundTrainer(self.learner) if background_training else None
+        self.trained_version = 0
+        # Pick up models registered by other processes, see model_watcher.py
+        self.watcher = None
+        if watch_model:
+            self.watcher = ModelWatcher(self.registry.root, model_version, self.registry.resolve(model_version),
+                                        len(np.ravel(self.model.coef_)))
+        # Per-approach observation features, see features.py
+        self.arrivals = np.zeros(len(APPROACHES))  # Cars spawned per approach so far
+        self.features = FeatureExtractor(self.intersection.lanes, BLOCK_SIZE, SIGNAL_COUNTERS, self.now())
+        # Past generations as (observation, green durations, reward, next observation)
+        self.replay = ReplayBuffer(REPLAY_CAPACITY, (len(APPROACHES), len(FEATURES)), (4,), path=replay_dir)
+        self.last_observation = None
+        self.last_action = None
         self.data = []  # Initialize data list for visualization
         self.current_signal_index = 0  # Track the current green signal
-        self.last_switch_time = time.time()  # Track the last switch time
+        self.last_switch_time = self.now()  # Track the last switch time
+        self.red_since = np.full(len(SIGNAL_LAYOUT), self.last_switch_time)  # When each signal last turned red
+        self.green_duration = 0  # Duration of the current green when a controller is used
+        self.phase_switches = 0
         
         # Initialize generation and car passed counters
         self.generation = 0
         self.cars_passed = 0
+        self.total_cars_passed = 0  # Not reset between generations
         self.cycle_count = 0
+
+    def now(self):
+        return time.time() if self.realtime else self.sim_time
         
     def load_or_create_model(self):
-        model_dir = 'D:/Python Codes/Reinforcement-Learning -Project/Traffic_management/model'
-        os.makedirs(model_dir, exist_ok=True)  # Ensure the directory exists
-
-        # Find the next available model file name
-        model_index = 0
-        while True:
-            model_path = os.path.join(model_dir, f'model{"" if model_index == 0 else f".{model_index}"}.pkl')
-            if not os.path.exists(model_path):
-                break
-            model_index += 1
-
-        # If no model file exists, create a new model and save it
-        if model_index == 0:
+        # If no model is registered yet, create a new model and save it
+        if self.registry.latest is None:
             model = self.create_model()
-            joblib.dump(model, model_path)
-        else:
-            model_path = os.path.join(model_dir, 'model.pkl')
-            model = joblib.load(model_path)
-
-        return model
+            self.registry.register(model, {'source': 'synthetic'})
+            return model
+        return self.registry.load(self.model_version)
+
+    def save_model(self):
+        # Register the current model, scored by the last finished generation
+        metrics = {'generation': self.generation}
+        if self.data:
+            metrics['reward'] = self.data[-1]['reward']
+            metrics['cars_passed'] = self.data[-1]['cars_passed']
+        return self.registry.register(self.model, metrics)
     
     def create_model(self):
-        # Generate synthetic data for demonstration purposes
-        np.random.seed(42)
-        n_samples = 5000
-        vehicle_count = np.random.randint(0, 50, n_samples)
-        green_light_duration = np.random.normal(2, 0.5, n_samples) * vehicle_count + np.random.randint(1, 5, n_samples)
+        # Synthetic data for demonstration purposes, generated once and cached
+        data = load_dataset()
+        vehicle_count = np.asarray(data['vehicle_count'])
+        green_light_duration = np.asarray(data['green_light_duration'])
 
         # Create and train a simple linear regression model
+        from sklearn.linear_model import LinearRegression  # Only needed when training from scratch
         X = vehicle_count.reshape(-1, 1)
         y = green_light_duration
         model = LinearRegression()
@@ -222,15 +323,29 @@ class CarGame:
 
         return model
 
-    def predict_green_light_duration(self):
-        vehicle_counts = [
+    def _refresh_predictor(self):
+        # Call whenever self.model is refit or replaced
+        self.predictor = LinearPredictor.from_model(self.model)
+        self._prediction_key = None
+        self._prediction = None
+
+    def vehicle_counts(self):
+        # Model input, in north, south, east, west order
+        return (
             self.counters['input_north'],
             self.counters['input_south'],
             self.counters['input_east'],
             self.counters['input_west']
-        ]
-        predictions = self.model.predict(np.array(vehicle_counts).reshape(-1, 1))
-        return predictions
+        )
+
+    def predict_green_light_duration(self):
+        vehicle_counts = self.vehicle_counts()
+        # Counters only change when cars stop or pass, so most frames reuse the
+        # last result (BatchInference may also have filled it in already)
+        if vehicle_counts != self._prediction_key:
+            self._prediction = self.predictor.predict(vehicle_counts)
+            self._prediction_key = vehicle_counts
+        return self._prediction
       
     # Add this method to update the model based on the reward
     def update_model(self):
@@ -246,26 +361,82 @@ class CarGame:
         # Calculate the reward (e.g., number of cars passed minus total waiting time)
         reward = self.cars_passed - self.calculate_waiting_time()
 
-        # Update the model with new data
-        X_new = np.array(vehicle_counts).reshape(-1, 1)
+        # Store the generation that just ended: what we saw, what we chose and how it went
+        observation = self.observe().copy()
+        if self.last_observation is not None:
+            self.replay.add(self.last_observation, self.last_action, reward, observation)
+        self.last_observation = observation
+        self.last_action = np.array(green_light_durations, dtype=np.float32)
+
+        # Update the model with new data, keeping what earlier generations learned
+        X_new = np.array(vehicle_counts, dtype=np.float64).reshape(-1, 1)
         y_new = np.array(green_light_durations) + reward  # Adjust the green light duration based on the reward
-        self.model.fit(X_new, y_new)
+        if self.trainer is not None:
+            self.trainer.submit(X_new, y_new)  # Swapped in by _swap_trained_model once fitted
+            return
+        self.learner.partial_fit(X_new, y_new)
+        self.learner.apply_to(self.model)
+        self._refresh_predictor()
+
+    def _adopt_reloaded_model(self):
+        if self.watcher.error is not None:
+            print(f"Keeping the current model: {self.watcher.error}")
+            self.watcher.error = None
+        reloaded = self.watcher.take()
+        if reloaded is None:
+            return
+        version, self.model = reloaded
+        print(f"Switched to model version {version}")
+        # Online learning continues from the new weights
+        self.learner = RecursiveLeastSquares.from_model(self.model)
+        if self.trainer is not None:
+            self.trainer.close()
+            self.trainer = BackgroundTrainer(self.learner)
+            self.trained_version = 0
+        self._refresh_predictor()
+
+    def _swap_trained_model(self):
+        published = self.trainer.poll(self.trained_version)
+        if published is not None:
+            self.trained_version, self.model.coef_, self.model.intercept_ = published
+            self._refresh_predictor()
         
     def update_signals(self):
-      predictions = self.predict_green_light_duration()
-      current_time = time.time()
-
-      # Calculate the green light duration for each signal
-      green_light_durations = [min(pred, 15) for pred in predictions]  # Ensure max duration is 15 seconds
-
-      # Check if it's time to switch signals
-      if current_time - self.last_switch_time >= green_light_durations[self.current_signal_index]:
-        # Switch to the next signal in round-robin fashion
-        self.current_signal_index = (self.current_signal_index + 1) % len(self.signals)
+      current_time = self.now()
+      previous_signal = self.current_signal_index
+
+      if self.controller is not None:
+        switched = current_time - self.last_switch_time >= self.green_duration
+        if switched:
+            phase, duration = self.controller.decide(self)
+            if phase == self.current_signal_index:
+                # Same phase again: extend its green rather than switching
+                self.green_duration = current_time - self.last_switch_time + duration
+                switched = False
+            else:
+                self.current_signal_index, self.green_duration = phase, duration
+      else:
+        predictions = self.predict_green_light_duration()
+
+        # Calculate the green light duration for each signal
+        green_light_durations = [min(pred, 15) for pred in predictions]  # Ensure max duration is 15 seconds
+
+        # Check if it's time to switch signals
+        switched = current_time - self.last_switch_time >= green_light_durations[self.current_signal_index]
+        if switched:
+            # Switch to the next signal in round-robin fashion
+            self.current_signal_index = (self.current_signal_index + 1) % len(self.signals)
+
+      if switched:
         self.last_switch_time = current_time
-
-        # Check if a full cycle has passed (all signals have been green once)
-        if self.current_signal_index == 0:
+        if self.watcher is not None:
+            self._adopt_reloaded_model()  # Phase boundary: a new model only affects the next decisions
+        if self.current_signal_index != previous_signal:
+            self.red_since[previous_signal] = current_time
+        self.phase_switches += 1
+
+        # Check if a full cycle has passed (as many switches as there are signals)
+        if self.phase_switches % len(self.signals) == 0:
             self.cycle_count += 1  # Increment cycle counter
 
             # Check if two full cycles have passed
@@ -292,7 +463,8 @@ class CarGame:
         }
         
         lane = random.choice(list(lane_coordinates.keys()))
-        car = [lane_coordinates[lane], lane, SPEED, False]  # Add stopped state attribute
+        car = [lane_coordinates[lane], lane, SPEED, False, 0.0]  # Add stopped state and waiting time attributes
+        self.arrivals[DIRECTION_APPROACH[lane]] += 1
         # print(f"Spawned car at {car[0]} going {car[1]}")
         return car
     
@@ -319,6 +491,7 @@ class CarGame:
                         car[2] = SPEED  # Restore the car's speed
                         car[3] = False  # Mark the car as moving
                         self.cars_passed += 1  # Increment cars passed counter
+                        self.total_cars_passed += 1
                         # Decrement the counter for the respective input lane
                         if car[1] == Direction.DOWN:
                             self.counters['input_north'] -= 1
@@ -330,50 +503,93 @@ class CarGame:
                             self.counters['input_west'] -= 1
 
     def _check_car_collision(self):
-        for i, car1 in enumerate(self.cars):
-            for j, car2 in enumerate(self.cars):
-                if i != j:
-                    car1_rect = pygame.Rect(car1[0].x, car1[0].y, BLOCK_SIZE, BLOCK_SIZE)
-                    car2_rect = pygame.Rect(car2[0].x, car2[0].y, BLOCK_SIZE, BLOCK_SIZE)
-                    if car1_rect.colliderect(car2_rect):
-                        if car1[2] == 0:  # If car1 is stopped
-                            car2[2] = 0  # Stop car2
+        if not self.cars:
+            return
+        # Pairwise overlap of the BLOCK_SIZE squares, same test as Rect.colliderect
+        xs, ys, _, _ = self._car_arrays()
+        overlap = (np.abs(xs[:, None] - xs[None, :]) < BLOCK_SIZE) & (np.abs(ys[:, None] - ys[None, :]) < BLOCK_SIZE)
+        np.fill_diagonal(overlap, False)
+        speeds = np.array([car[2] for car in self.cars])
+        # Walk the cars in order so a car stopped earlier in the pass can stop
+        # the cars behind it, exactly like the pairwise loop did
+        for i in np.flatnonzero(overlap.any(axis=1)):
+            if speeds[i] == 0:  # If car1 is stopped
+                speeds[overlap[i]] = 0  # Stop the cars it touches
+        for car, speed in zip(self.cars, speeds.tolist()):
+            car[2] = speed
 
     def play_step(self):
         # 1. collect user input    
-        for event in pygame.event.get():
+        for event in pygame.event.get() if not self.headless else []:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 quit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
+            elif self.camera.handle_event(event):
+                continue
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 mouse_pos = pygame.mouse.get_pos()
                 for signal in self.signals:
-                    signal.handle_click(mouse_pos)
+                    signal.handle_click(self.camera.to_world(mouse_pos))
                 if self.start_button.handle_click(mouse_pos):
                     self.simulation_started = True
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_h and self.heatmap is not None:
+                self.heatmap.visible = not self.heatmap.visible
         
         if self.simulation_started:
+            if self.trainer is not None:
+                self._swap_trained_model()
             self.update_signals()
             # Spawn new car every 1 second
-            if time.time() - self.spawn_time > 1:
+            if self.now() - self.spawn_time > 1:
                 self.cars.append(self._spawn_car())
-                self.spawn_time = time.time()
+                self.spawn_time = self.now()
             
             # 2. move
             for car in self.cars:
                 self._check_signal_collision(car)
                 self._move(car)
+                if car[2] == 0:
+                    car[4] += 1 / SPEED  # Seconds spent stopped
             
             # self._check_car_distance()
             self._check_car_collision()
             
             # 3. check if game over
             self.cars = [car for car in self.cars if not self._is_collision(car)]
+
+            if self.heatmap is not None:
+                xs, ys, _, stopped = self._car_arrays()
+                self.heatmap.accumulate(xs, ys, stopped)
         
         # 4. update ui and clock
-        self._update_ui()
-        self.clock.tick(SPEED)
+        if self.shared_state is not None:
+            self.shared_state.publish(self)
+        if not self.headless:
+            self._update_ui()
+        if self.recorder is not None:
+            self.recorder.capture(self)
+        self.frame += 1
+        if self.realtime:
+            self.clock.tick(SPEED)
+        else:
+            self.sim_time += 1 / SPEED
         
+    def _car_arrays(self):
+        # Vehicle state as flat arrays: x, y, direction value and stopped flag
+        n = len(self.cars)
+        xs = np.fromiter((car[0].x for car in self.cars), dtype=np.float32, count=n)
+        ys = np.fromiter((car[0].y for car in self.cars), dtype=np.float32, count=n)
+        directions = np.fromiter((car[1].value for car in self.cars), dtype=np.int8, count=n)
+        stopped = np.fromiter((car[3] for car in self.cars), dtype=bool, count=n)
+        return xs, ys, directions, stopped
+
+    def _car_wait_array(self):
+        return np.fromiter((car[4] for car in self.cars), dtype=np.float32, count=len(self.cars))
+
+    def observe(self):
+        # (approaches, features) observation for controllers, see features.py
+        return self.features.observe(self)
+
     def _is_collision(self, car):
         x, y = car[0].x, car[0].y
         if x < 0 or x > self.w or y < 0 or y > self.h:
@@ -381,17 +597,36 @@ class CarGame:
         return False
         
     def _update_ui(self):
+        self._draw()
+        pygame.display.flip()
+
+    def _draw(self):
+        screen = self.screen_properties.screen
+        camera = self.camera
         self.screen_properties.fill()
-        self.intersection.draw()
-        for car in self.cars:
-            print(f"Drawing car at {car[0]}")
-            pygame.draw.rect(self.screen_properties.screen, BLACK, (car[0].x, car[0].y, BLOCK_SIZE * 3, BLOCK_SIZE * 3))
+        if camera.aggregated:
+            # Zoomed out: colour each approach by its queue instead of drawing cars
+            link_colors = {lane: queue_color(count) for lane, count in self.counters.items()}
+            self.intersection.draw(camera, link_colors)
+        else:
+            self.intersection.draw(camera)
+        if self.heatmap is not None and self.heatmap.visible:
+            camera.blit_world(screen, self.heatmap.overlay())
+        if not camera.aggregated:
+            # Cull cars outside the viewport before any per-car drawing work
+            car_size = BLOCK_SIZE * 3
+            xs, ys, _, _ = self._car_arrays()
+            on_screen = camera.visible(xs, ys, car_size)
+            sx, sy = camera.to_screen(xs[on_screen], ys[on_screen])
+            size = max(1, round(car_size * camera.zoom))
+            for x, y in zip(sx.tolist(), sy.tolist()):
+                pygame.draw.rect(screen, BLACK, (x, y, size, size))
         for signal in self.signals:
-            signal.draw()
+            signal.draw(camera)
         self.start_button.draw()
         
         # Display counters
-        counter_font = pygame.font.SysFont('arial', 20)
+        counter_font = get_font(20)
         counter_texts = [
             f"North: {self.counters['input_north']}",
             f"South: {self.counters['input_south']}",
@@ -403,8 +638,6 @@ class CarGame:
         for i, text in enumerate(counter_texts):
             text_surface = counter_font.render(text, True, BLACK)
             self.screen_properties.screen.blit(text_surface, (self.w - 150, 100 + i * 30))
-        
-        pygame.display.flip()
     
     # Add this method to calculate the total waiting time
     def calculate_waiting_time(self):
@@ -451,30 +684,145 @@ class CarGame:
         'reward': reward
       })
 
-    def update_plots(self, ax):
-      ax.clear()
-      generations = [d['generation'] for d in self.data]
-      cars_passed = [d['cars_passed'] for d in self.data]
-      rewards = [d['reward'] for d in self.data]
-    
-      ax.plot(generations, rewards, label='Reward per Generation', color='red', marker='o', linestyle='-')
-      ax.plot(generations, cars_passed, label='Cars Passed per Generation', color='blue', marker='o', linestyle='-')
-      
-      ax.set_xlabel('Generation')
-      ax.set_ylabel('Number of Cars Passed / Reward')
-      ax.legend()
-      plt.draw()
-      plt.pause(0.01)
-
 if __name__ == '__main__':
-    game = CarGame()
-    fig, ax = plt.subplots()  # Initialize Matplotlib figure and axis
+    import multiprocessing
+    import signal
+    from shared_state import SharedState, DEFAULT_SHM_NAME
+    from recorder import FrameRecorder, RECORD_FORMATS
+    from heatmap import Heatmap, HEATMAP_MODES
+    from q_learning import QLearningController
+    from evolution import TimingPolicy
+    from controllers import CONTROLLERS
+    from checkpoint import Checkpointer, load_checkpoint, CHECKPOINT_EVERY
+
+    parser = argparse.ArgumentParser(description='Traffic signal simulation')
+    parser.add_argument('--headless', action='store_true',
+                        help='run without a window and publish state to shared memory for viewer.py')
+    parser.add_argument('--viewer', action='store_true',
+                        help='run headless and render in a separate viewer process')
+    parser.add_argument('--shm-name', default=DEFAULT_SHM_NAME,
+                        help='name of the shared memory block used by viewers')
+    parser.add_argument('--record', metavar='DIR',
+                        help='record frames to DIR in the background')
+    parser.add_argument('--record-every', type=int, default=SPEED,
+                        help='record every N-th tick (default: one frame per simulated second)')
+    parser.add_argument('--record-format', choices=RECORD_FORMATS, default='png',
+                        help='PNG sequence or compressed NumPy chunks')
+    parser.add_argument('--replay-dir', metavar='DIR',
+                        help='keep the experience replay buffer in memory-mapped files under DIR')
+    parser.add_argument('--model-dir', default=MODEL_DIR,
+                        help='model registry directory (default: $TRAFFIC_MODEL_DIR or ./model)')
+    parser.add_argument('--model-version', default=MODEL_VERSION,
+                        help="registered model to run: 'latest', 'best' or a version number")
+    parser.add_argument('--sync-training', action='store_true',
+                        help='update the model inside the frame loop instead of on a background thread')
+    parser.add_argument('--watch-model', action='store_true',
+                        help='switch to newly registered models (of --model-version) without restarting')
+    parser.add_argument('--save-model', action='store_true',
+                        help='register the learned model as a new version on exit')
+    parser.add_argument('--controller', choices=sorted(CONTROLLERS),
+                        help='control the signals with a built-in controller instead of the model')
+    parser.add_argument('--schedule', metavar='JSON',
+                        help='fixed-time control with Webster plans from a time-of-day demand schedule, a list of '
+                             '[start second after local midnight, [west, east, north, south flows in veh/s]]')
+    parser.add_argument('--checkpoint', metavar='PATH',
+                        help='save the learning session to PATH periodically and on exit')
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY, metavar='N',
+                        help='generations between checkpoints')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue the session saved in --checkpoint, if there is one')
+    parser.add_argument('--q-table', metavar='PATH',
+                        help='control the signals with a Q-table trained by q_learning.py')
+    parser.add_argument('--policy', metavar='ARCHIVE',
+                        help='run the best timing policy from an elite archive written by evolution.py')
+    parser.add_argument('--heatmap', action='store_true',
+                        help='accumulate an occupancy / stop time heatmap (press H to toggle the overlay)')
+    parser.add_argument('--heatmap-mode', choices=HEATMAP_MODES, default='stop_time')
+    parser.add_argument('--heatmap-out', metavar='PATH',
+                        help='save the heatmap image to PATH on exit')
+    args = parser.parse_args()
+
+    viewer_process = None
+    if args.headless or args.viewer:
+        game = CarGame(headless=True, replay_dir=args.replay_dir, model_dir=args.model_dir,
+                       model_version=args.model_version, background_training=not args.sync_training,
+                       watch_model=args.watch_model)
+        game.shared_state = SharedState(args.shm_name, create=True, width=game.w, height=game.h)
+        if args.viewer:
+            from viewer import run_viewer
+            viewer_process = multiprocessing.Process(target=run_viewer, args=(args.shm_name, True), daemon=True)
+            viewer_process.start()
+    else:
+        from live_plot import LivePlot
+        game = CarGame(replay_dir=args.replay_dir, model_dir=args.model_dir, model_version=args.model_version,
+                       background_training=not args.sync_training, watch_model=args.watch_model)
+        live_plot = LivePlot()
+    if args.q_table:
+        game.controller = QLearningController.load(args.q_table)
+    elif args.policy:
+        with open(args.policy) as f:
+            game.controller = TimingPolicy(json.load(f)[0]['genome'])
+    elif args.schedule:
+        from webster import WebsterController, TimeOfDaySchedule
+        with open(args.schedule) as f:
+            game.controller = WebsterController(TimeOfDaySchedule(json.load(f)))
+    elif args.controller:
+        game.controller = CONTROLLERS[args.controller]()
+    checkpointer = None
+    if args.checkpoint:
+        checkpointer = Checkpointer(args.checkpoint, args.checkpoint_every)
+        if args.resume and os.path.exists(args.checkpoint):
+            load_checkpoint(game, args.checkpoint)
+            checkpointer.saved_generation = game.generation
+            print(f"Resumed from {args.checkpoint} at generation {game.generation}")
+    if args.record:
+        game.recorder = FrameRecorder(args.record, (game.w, game.h), args.record_every, args.record_format)
+    if args.heatmap or args.heatmap_out:
+        game.heatmap = Heatmap((game.w, game.h), BLOCK_SIZE, 1 / SPEED, refresh_every=SPEED)
+        game.heatmap.mode = args.heatmap_mode
+
+    if game.headless:
+        # SDL turns SIGTERM into a QUIT event that a headless run never reads;
+        # stop as on Ctrl-C instead, so the cleanup below runs
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
 
     # game loop
-    running = True
-    while running:
-        game.play_step()
-        game.collect_data()  # Collect data for visualization
-        game.update_plots(ax)  # Update Matplotlib plots
+    try:
+        while True:
+            game.play_step()
+            if checkpointer is not None:
+                checkpointer.maybe_save(game)
+            if not game.headless:
+                live_plot.update(game.data)  # Throttled, only plots new generations
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if game.shared_state is not None:
+            game.shared_state.close()
+        if viewer_process is not None:
+            # SDL turns SIGTERM into a QUIT event rather than exiting, so kill
+            # the viewer if it has not shut down by then
+            viewer_process.terminate()
+            viewer_process.join(VIEWER_EXIT_TIMEOUT)
+            if viewer_process.is_alive():
+                viewer_process.kill()
+                viewer_process.join()
+        if game.recorder is not None:
+            game.recorder.close()
+        game.replay.flush()
+        if game.watcher is not None:
+            game.watcher.close()
+        if checkpointer is not None:
+            checkpointer.save(game)
+        if game.trainer is not None:
+            game.trainer.close()  # Finishes the queued updates first
+            game._swap_trained_model()
+            stats = game.trainer.lag_stats()
+            print(f"Background training: {stats['updates']} updates, lag mean {stats['mean_lag_ms']:.2f} ms, "
+                  f"max {stats['max_lag_ms']:.2f} ms")
+        if args.save_model:
+            print(f"Registered model version {game.save_model()}")
+        if args.heatmap_out:
+            game.heatmap.save(args.heatmap_out)
 
     pygame.quit()
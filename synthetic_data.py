@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# Synthetic (vehicle count -> green light duration) training data, cached on
+# disk as one .npy file per column under a directory named after a hash of
+# the generator parameters. Cached columns are memory-mapped, so repeated
+# training runs skip both generation and any text parsing.
+
+CACHE_DIR = os.environ.get('TRAFFIC_DATA_CACHE',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_cache'))
+COLUMNS = ('vehicle_count', 'green_light_duration')
+DEFAULT_PARAMS = {
+    'n_samples': 5000,
+    'seed': 42,
+    'max_vehicles': 50,
+    'rate_mean': 2.0,  # Seconds of green per waiting vehicle
+    'rate_std': 0.5,
+    'base_low': 1,  # Fixed part of the green time, drawn from [base_low, base_high)
+    'base_high': 5,
+}
+
+
+def generate(n_samples, seed, max_vehicles, rate_mean, rate_std, base_low, base_high):
+    # Same draws as seeding the global NumPy RNG and sampling in this order
+    rng = np.random.RandomState(seed)
+    vehicle_count = rng.randint(0, max_vehicles, n_samples)
+    green_light_duration = rng.normal(rate_mean, rate_std, n_samples) * vehicle_count + rng.randint(base_low, base_high, n_samples)
+    return {'vehicle_count': vehicle_count, 'green_light_duration': green_light_duration}
+
+
+def cache_key(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def load_dataset(cache_dir=CACHE_DIR, **overrides):
+    # Columns as a dict of read-only memory-mapped arrays
+    params = dict(DEFAULT_PARAMS, **overrides)
+    directory = os.path.join(cache_dir, cache_key(params))
+    paths = {column: os.path.join(directory, f'{column}.npy') for column in COLUMNS}
+    if not all(os.path.exists(path) for path in paths.values()):
+        os.makedirs(directory, exist_ok=True)
+        data = generate(**params)
+        with open(os.path.join(directory, 'params.json'), 'w') as f:
+            json.dump(params, f, indent=2)
+        for column, path in paths.items():
+            # Write then rename, so a concurrent reader never maps a partial file
+            tmp_path = f'{path}.{os.getpid()}.tmp.npy'
+            np.save(tmp_path, data[column])
+            os.replace(tmp_path, path)
+    return {column: np.load(path, mmap_mode='r') for column, path in paths.items()}
+
+
+# Multi-feature dataset for richer controllers. One row is one approach at a
+# decision point; the target is the green time it should get.
+FEATURE_COLUMNS = ('queue_length', 'occupancy', 'arrival_rate', 'mean_wait', 'time_since_green')
+TARGET_COLUMN = 'green_light_duration'
+LANE_CAPACITY = 17  # Cars that fit on an approach lane
+CHUNK_ROWS = 1000000
+MANIFEST_FILE = 'manifest.json'
+
+
+def generate_features(rng, n_rows, max_vehicles=50, rate_mean=2.0, rate_std=0.5, base_low=1, base_high=5):
+    queue = rng.integers(0, max_vehicles, n_rows)
+    occupancy = np.clip(queue / LANE_CAPACITY + rng.normal(0, 0.05, n_rows), 0, 1)
+    arrival_rate = rng.gamma(2.0, 0.15, n_rows)  # Vehicles per second
+    mean_wait = rng.exponential(2.0 + 0.5 * queue)
+    time_since_green = rng.uniform(0, 120, n_rows)
+    green = (rng.normal(rate_mean, rate_std, n_rows) * queue + 8.0 * arrival_rate
+             + 0.05 * mean_wait + 0.02 * time_since_green + rng.integers(base_low, base_high, n_rows))
+    return {
+        'queue_length': queue.astype(np.float32),
+        'occupancy': occupancy.astype(np.float32),
+        'arrival_rate': arrival_rate.astype(np.float32),
+        'mean_wait': mean_wait.astype(np.float32),
+        'time_since_green': time_since_green.astype(np.float32),
+        TARGET_COLUMN: green.astype(np.float32),
+    }
+
+
+def _write_chunk(job):
+    # Runs in a worker process: generate one chunk and write its columns
+    out_dir, index, n_rows, seed_sequence, params = job
+    chunk_dir = os.path.join(out_dir, f'chunk_{index:05d}')
+    os.makedirs(chunk_dir, exist_ok=True)
+    columns = generate_features(np.random.default_rng(seed_sequence), n_rows, **params)
+    for column, values in columns.items():
+        np.save(os.path.join(chunk_dir, f'{column}.npy'), values)
+    return index, n_rows
+
+
+def generate_chunked(out_dir, n_rows, seed=42, chunk_rows=CHUNK_ROWS, workers=None, **params):
+    # Write n_rows in chunks of chunk_rows from a process pool. Each chunk has
+    # its own seed stream spawned from `seed`, so the data does not depend on
+    # the number of workers, and at most one chunk per worker is in memory.
+    from multiprocessing import Pool
+    from model_registry import atomic_write
+    os.makedirs(out_dir, exist_ok=True)
+    # A re-run rewrites the chunks in place, so the old manifest must not
+    # outlive them in case this run stops part-way
+    try:
+        os.remove(os.path.join(out_dir, MANIFEST_FILE))
+    except FileNotFoundError:
+        pass
+    n_chunks = -(-n_rows // chunk_rows)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    jobs = [(out_dir, i, min(chunk_rows, n_rows - i * chunk_rows), seeds[i], params) for i in range(n_chunks)]
+    chunks = [0] * n_chunks
+    with Pool(workers) as pool:
+        for index, rows in pool.imap_unordered(_write_chunk, jobs):
+            chunks[index] = rows
+    manifest = {
+        'rows': n_rows,
+        'seed': seed,
+        'params': params,
+        'columns': list(FEATURE_COLUMNS) + [TARGET_COLUMN],
+        'chunks': [{'dir': f'chunk_{i:05d}', 'rows': rows} for i, rows in enumerate(chunks)],
+    }
+    # The manifest goes last and in one piece, so its presence marks a complete dataset
+    data = json.dumps(manifest, indent=2).encode()
+    atomic_write(os.path.join(out_dir, MANIFEST_FILE), lambda f: f.write(data))
+    return manifest
+
+
+def read_manifest(out_dir):
+    with open(os.path.join(out_dir, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def iter_chunks(out_dir, columns=None):
+    # Yield each chunk as a dict of memory-mapped columns
+    manifest = read_manifest(out_dir)
+    for chunk in manifest['chunks']:
+        chunk_dir = os.path.join(out_dir, chunk['dir'])
+        yield {column: np.load(os.path.join(chunk_dir, f'{column}.npy'), mmap_mode='r')
+               for column in columns or manifest['columns']}
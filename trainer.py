@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+from collections import deque
+
+LAG_HISTORY = 1000  # Training lags kept for the statistics
+
+
+class BackgroundTrainer:
+    # Runs the online learner on a worker thread. update_model() submits each
+    # generation's experience and returns at once; the worker fits it and
+    # publishes (version, coef, intercept) by rebinding a single attribute,
+    # which the simulation picks up between frames with poll(). Until then
+    # it keeps predicting with the previous weights.
+
+    def __init__(self, learner):
+        self.learner = learner  # Only the worker thread touches it from here on
+        self.experience = queue.Queue()
+        self.published = None
+        self.version = 0
+        self.submitted = 0
+        self.error = None
+        self.lags = deque(maxlen=LAG_HISTORY)  # Seconds from submit() to publishing the update
+        self.thread = threading.Thread(target=self._run, name='trainer', daemon=True)
+        self.thread.start()
+
+    def submit(self, X, y):
+        self.submitted += 1
+        self.experience.put((time.perf_counter(), X, y))
+
+    def _run(self):
+        while True:
+            item = self.experience.get()
+            try:
+                if item is None:
+                    return
+                submitted_at, X, y = item
+                self.learner.partial_fit(X, y)
+                self.version += 1
+                self.published = (self.version, self.learner.coef_.copy(), float(self.learner.intercept_))
+                self.lags.append(time.perf_counter() - submitted_at)
+            except Exception as exc:
+                self.error = exc  # Raised in the simulation thread by poll()
+            finally:
+                self.experience.task_done()
+
+    @property
+    def pending(self):
+        return self.experience.qsize()
+
+    def poll(self, seen_version):
+        # The latest published weights if they are newer than seen_version
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError('Background training failed') from error
+        published = self.published
+        if published is not None and published[0] != seen_version:
+            return published
+        return None
+
+    def drain(self):
+        # Block until everything submitted so far has been trained on
+        self.experience.join()
+
+    def close(self):
+        self.experience.put(None)
+        self.thread.join()
+
+    def lag_stats(self):
+        lags = list(self.lags)
+        return {
+            'updates': self.version,
+            'pending': self.pending,
+            'mean_lag_ms': 1000 * sum(lags) / len(lags) if lags else 0.0,
+            'max_lag_ms': 1000 * max(lags) if lags else 0.0,
+            'last_lag_ms': 1000 * lags[-1] if lags else 0.0,
+        }
@@ -0,0 +1,91 @@
+import argparse
+import time
+import pygame
+from shared_state import SharedState, DEFAULT_SHM_NAME
+
+VIEWER_FPS = 60
+
+
+def _attach(name):
+    # Wait for a simulation to create the shared block; None if the window is
+    # closed (or the process sent SIGTERM, which SDL turns into QUIT) meanwhile
+    while True:
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            return None
+        try:
+            return SharedState(name)
+        except FileNotFoundError:
+            time.sleep(0.5)
+
+
+def run_viewer(name=DEFAULT_SHM_NAME, exit_on_detach=False):
+    # With exit_on_detach the viewer stops when its simulation shuts down
+    # instead of waiting for the next one, as simulation.py --viewer wants.
+    # Imported here so simulation.py can import this module without a cycle
+    from simulation import (ScreenProperties, Intersection, SIGNAL_LAYOUT, L_GREEN,
+                            BLACK, BLOCK_SIZE)
+
+    pygame.init()
+    state = _attach(name)
+    if state is None:
+        pygame.quit()
+        return
+    w, h = state.size
+    screen_properties = ScreenProperties(w, h, L_GREEN, 'Traffic Simulation (viewer)')
+    screen = screen_properties.screen
+    intersection = Intersection(screen_properties)
+    counter_font = pygame.font.SysFont('arial', 20)
+    clock = pygame.time.Clock()
+
+    last_seq = -1
+    running = True
+    try:
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+            if not state.alive:
+                # Simulation went away, wait for the next one
+                state.close()
+                state = None if exit_on_detach else _attach(name)
+                if state is None:
+                    break
+                last_seq = -1
+
+            seq, slot = state.read()
+            if seq != last_seq:
+                last_seq = seq
+                screen_properties.fill()
+                intersection.draw()
+                for x, y in slot['cars'][:slot['n_cars'], :2].tolist():
+                    pygame.draw.rect(screen, BLACK, (x, y, BLOCK_SIZE * 3, BLOCK_SIZE * 3))
+                for (position, size, _), color in zip(SIGNAL_LAYOUT, slot['signal_colors']):
+                    pygame.draw.rect(screen, tuple(int(c) for c in color), (*position, *size))
+
+                north, south, east, west = slot['counters']
+                counter_texts = [
+                    f"North: {north}",
+                    f"South: {south}",
+                    f"East: {east}",
+                    f"West: {west}",
+                    f"Cars Passed: {slot['cars_passed']}",
+                    f"Generation: {slot['generation']}"
+                ]
+                for i, text in enumerate(counter_texts):
+                    text_surface = counter_font.render(text, True, BLACK)
+                    screen.blit(text_surface, (w - 150, 100 + i * 30))
+                pygame.display.flip()
+            clock.tick(VIEWER_FPS)
+    except KeyboardInterrupt:
+        pass
+    # Detach only; the simulation owns and unlinks the block
+    if state is not None:
+        state.close()
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Attach a viewer to a running headless simulation')
+    parser.add_argument('--shm-name', default=DEFAULT_SHM_NAME)
+    args = parser.parse_args()
+    run_viewer(args.shm_name)
@@ -0,0 +1,128 @@
+import time
+from bisect import bisect_right
+import numpy as np
+from controllers import FixedTimeController, PHASE_ROWS, N_PHASES, MIN_GREEN
+from features import FEATURES
+
+SATURATION_FLOW = 10.0  # Vehicles per second; a released queue discharges about one car every two ticks
+LOST_TIME = 2.0  # Start-up lost time per phase, in seconds
+MIN_CYCLE = 30.0
+MAX_CYCLE = 120.0
+MAX_FLOW_RATIO = 0.9  # Beyond this the intersection is oversaturated and gets MAX_CYCLE
+LEVEL_STEP = 0.05  # Demand quantization, in vehicles per second per approach
+DAY_SECONDS = 24 * 3600
+ARRIVAL_RATE = FEATURES.index('arrival_rate')
+
+
+class WebsterPlanner:
+    # Webster's method: optimal cycle C = (1.5 L + 5) / (1 - Y) from the
+    # total lost time L and the sum Y of the critical flow ratios q / s, and
+    # effective green split in proportion to each phase's flow ratio. Flows
+    # are quantized to demand levels of `level_step` and each level's plan
+    # is solved once and cached.
+
+    def __init__(self, saturation_flow=SATURATION_FLOW, lost_time=LOST_TIME, min_green=MIN_GREEN,
+                 min_cycle=MIN_CYCLE, max_cycle=MAX_CYCLE, level_step=LEVEL_STEP):
+        self.saturation_flow = saturation_flow
+        self.lost_time = lost_time
+        self.min_green = min_green
+        self.min_cycle = min_cycle
+        self.max_cycle = max_cycle
+        self.level_step = level_step
+        self.cache = {}  # Demand levels per phase -> (cycle, greens)
+        self.hits = 0
+        self.misses = 0
+
+    def levels(self, flows):
+        return tuple(int(level) for level in np.rint(np.asarray(flows) / self.level_step))
+
+    def solve(self, flows):
+        # (cycle length, green per phase) for per-phase flows in vehicles per second
+        ratios = np.asarray(flows, dtype=np.float64) / self.saturation_flow
+        total_ratio = ratios.sum()
+        lost = self.lost_time * len(ratios)
+        if total_ratio < MAX_FLOW_RATIO:
+            cycle = (1.5 * lost + 5) / (1 - total_ratio)
+        else:
+            cycle = self.max_cycle
+        cycle = min(max(cycle, self.min_cycle), self.max_cycle)
+        if total_ratio > 0:
+            greens = (cycle - lost) * ratios / total_ratio
+        else:
+            greens = np.full(len(ratios), (cycle - lost) / len(ratios))
+        greens = np.maximum(greens, self.min_green)
+        return float(greens.sum() + lost), tuple(greens.tolist())
+
+    def plan(self, flows):
+        key = self.levels(flows)
+        plan = self.cache.get(key)
+        if plan is None:
+            self.misses += 1
+            plan = self.cache[key] = self.solve(np.array(key) * self.level_step)
+        else:
+            self.hits += 1
+        return plan
+
+
+def local_time_of_day(timestamp):
+    # Seconds since local midnight for a time.time() timestamp
+    t = time.localtime(timestamp)
+    return t.tm_hour * 3600 + t.tm_min * 60 + t.tm_sec + timestamp % 1
+
+
+class TimeOfDaySchedule:
+    # Demand profile as (start second of local time of day, per-phase flows)
+    # periods; the plans are solved when the schedule is built, so lookups
+    # are a bisect
+
+    def __init__(self, periods, planner=None, day_length=DAY_SECONDS):
+        planner = planner or WebsterPlanner()
+        periods = sorted(periods, key=lambda period: period[0])
+        self.starts = [start for start, _ in periods]
+        self.plans = [planner.plan(flows) for _, flows in periods]
+        self.day_length = day_length
+
+    def plan_at(self, t):
+        # Plan in force at t seconds; before the first start, the last period wraps around
+        return self.plans[bisect_right(self.starts, t % self.day_length) - 1]
+
+
+class WebsterController(FixedTimeController):
+    # Fixed-time control whose greens are replaced at the start of every
+    # cycle: from the time-of-day schedule if there is one, otherwise from
+    # the arrival rates measured on each approach. On the wall clock the
+    # schedule follows local time; on the simulated clock the game starts
+    # `sim_start` seconds after midnight.
+
+    def __init__(self, schedule=None, planner=None, order=None, sim_start=0.0):
+        self.schedule = schedule
+        self.sim_start = sim_start
+        self.planner = planner or WebsterPlanner()
+        self.flows = np.zeros(N_PHASES, dtype=np.float32)
+        self.rows = np.array(PHASE_ROWS)
+        self.cycle = None
+        super().__init__(MIN_GREEN, order)
+
+    def decide(self, game):
+        if self.position == len(self.order) - 1 or self.position < 0:
+            if self.schedule is not None:
+                self.cycle, greens = self.schedule.plan_at(self.time_of_day(game))
+            else:
+                np.take(game.observe()[:, ARRIVAL_RATE], self.rows, out=self.flows)
+                self.cycle, greens = self.planner.plan(self.flows)
+            self.set_greens(greens)
+        return super().decide(game)
+
+    def state_dict(self):
+        state = super().state_dict()
+        state['cycle'] = np.nan if self.cycle is None else self.cycle
+        return state
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        self.cycle = None if np.isnan(state['cycle']) else float(state['cycle'])
+
+    def time_of_day(self, game):
+        if game.realtime:
+            return local_time_of_day(game.now())
+        return self.sim_start + game.now()